@@ -0,0 +1,63 @@
+from bisect import bisect_left
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from api.reference import ReferenceData, VersionedCache
+from recipes.models import Ingredients
+
+INGREDIENTS_INDEX_TTL = getattr(settings, 'INGREDIENTS_INDEX_TTL', 300)
+INGREDIENTS_AUTOCOMPLETE_LIMIT = getattr(
+    settings, 'INGREDIENTS_AUTOCOMPLETE_LIMIT', 50
+)
+
+
+@dataclass(frozen=True)
+class IngredientsData(ReferenceData):
+    keys: list = None
+
+
+class IngredientPrefixIndex(VersionedCache):
+    """Отсортированный индекс ингредиентов для автодополнения.
+
+    Загружается один раз на процесс и сбрасывается по версии, которую
+    увеличивают сигналы при изменении ингредиентов. Тот же снимок служит
+    словарём id -> ингредиент для проверки входных данных.
+    """
+
+    name = 'ingredients'
+    model = Ingredients
+
+    def __init__(self, ttl=INGREDIENTS_INDEX_TTL):
+        super().__init__(ttl=ttl)
+
+    @staticmethod
+    def normalize(value):
+        return value.casefold()
+
+    def load(self):
+        rows = sorted(
+            Ingredients.objects.values('id', 'name', 'measurement_unit'),
+            key=lambda row: (self.normalize(row['name']), row['id'])
+        )
+        return IngredientsData(
+            payload=rows,
+            by_id={row['id']: row for row in rows},
+            keys=[self.normalize(row['name']) for row in rows],
+        )
+
+    def search(self, prefix, limit=INGREDIENTS_AUTOCOMPLETE_LIMIT):
+        """Ингредиенты, название которых начинается с prefix."""
+        data = self.get()
+        keys, items = data.keys, data.payload
+        prefix = self.normalize(prefix)
+        start = bisect_left(keys, prefix)
+        result = []
+        for index in range(start, len(keys)):
+            if len(result) >= limit or not keys[index].startswith(prefix):
+                break
+            result.append(items[index])
+        return result
+
+
+ingredients_index = IngredientPrefixIndex()
@@ -0,0 +1,208 @@
+import random
+import statistics
+import time
+import uuid
+from dataclasses import dataclass
+
+from django.db import connection
+from rest_framework.authtoken.models import Token
+
+from api.utils import shopping_lists_cache
+from myprofile.models import MyProfile, Subscription
+from recipes.counters import rebuild_counters
+from recipes.models import Ingredients, RecipeIngredients, Recipes, Tags
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+
+@dataclass
+class Scenario:
+    """Один замер: HTTP-запрос и пользователь, от имени которого он идёт.
+
+    Если задан ``undo``, он выполняется после каждого запроса и не входит
+    в замер, чтобы переключатели избранного и корзины можно было повторять.
+    ``cold`` сбрасывает кэш готовых списков покупок перед каждым запросом.
+    """
+    name: str
+    method: str
+    url: str
+    authenticated: bool = True
+    undo: str = None
+    cold: bool = False
+
+
+def seed(users=50, recipes=500, ingredients=300, tags=6,
+         ingredients_per_recipe=8, seed_value=0):
+    """Наполняет БД синтетическими данными и возвращает основного юзера.
+
+    Уникальные поля получают суффикс запуска, поэтому данные не
+    конфликтуют с уже существующими в БД.
+    """
+    rnd = random.Random(seed_value)
+    run = uuid.uuid4().hex[:8]
+    profiles = MyProfile.objects.bulk_create([
+        MyProfile(
+            email=f'bench{number}-{run}@example.com',
+            username=f'bench{number}-{run}',
+            first_name='Bench',
+            last_name=str(number),
+        )
+        for number in range(users)
+    ])
+    tag_objects = Tags.objects.bulk_create([
+        Tags(name=f'bench-{run}-{number}', slug=f'bench-{run}-{number}')
+        for number in range(tags)
+    ])
+    ingredient_objects = Ingredients.objects.bulk_create([
+        Ingredients(
+            name=f'бенч ингредиент {number} {run}', measurement_unit='г'
+        )
+        for number in range(ingredients)
+    ])
+    recipe_objects = Recipes.objects.bulk_create([
+        Recipes(
+            author=rnd.choice(profiles),
+            name=f'Бенчмарк рецепт {number}',
+            text='Нарезать, смешать и запечь до готовности.',
+            cooking_time=rnd.randint(5, 120),
+        )
+        for number in range(recipes)
+    ])
+    Recipes.tags.through.objects.bulk_create([
+        Recipes.tags.through(recipes_id=recipe.id, tags_id=tag.id)
+        for recipe in recipe_objects
+        for tag in rnd.sample(tag_objects, 2)
+    ])
+    RecipeIngredients.objects.bulk_create([
+        RecipeIngredients(recipe=recipe, ingredient=ingredient,
+                          amount=rnd.randint(1, 500))
+        for recipe in recipe_objects
+        for ingredient in rnd.sample(
+            ingredient_objects, ingredients_per_recipe
+        )
+    ])
+    user = profiles[0]
+    user.set_password(BENCHMARK_PASSWORD)
+    user.save(update_fields=('password',))
+    favorites = rnd.sample(recipe_objects, min(40, recipes))
+    user.favorite_recipes.add(*favorites)
+    user.shopping_cart_recipes.add(*rnd.sample(favorites, len(favorites) // 2))
+    Subscription.objects.bulk_create([
+        Subscription(subscriber=user, subscribe_to=author)
+        for author in profiles[1:]
+    ])
+    rebuild_counters()
+    return user, profiles, tag_objects, recipe_objects
+
+
+def build_scenarios(user, profiles, tags, recipes):
+    """Горячие эндпоинты, включая все сочетания фильтров RecipesFilter."""
+    author = profiles[1].id
+    first, second = tags[0].slug, tags[1].slug
+    recipe = recipes[-1].id
+    toggled = next(
+        item.id for item in recipes
+        if not user.favorite_recipes.filter(id=item.id).exists()
+        and not user.shopping_cart_recipes.filter(id=item.id).exists()
+    )
+    filters = {
+        'recipes_list': '',
+        'recipes_list_page_5': 'page=5',
+        'recipes_list_cursor': 'cursor=',
+        'recipes_author': f'author={author}',
+        'recipes_tag': f'tags={first}',
+        'recipes_tags_two': f'tags={first}&tags={second}',
+        'recipes_favorited': 'is_favorited=1',
+        'recipes_not_favorited': 'is_favorited=0',
+        'recipes_in_cart': 'is_in_shopping_cart=1',
+        'recipes_not_in_cart': 'is_in_shopping_cart=0',
+        'recipes_author_tag': f'author={author}&tags={first}',
+        'recipes_favorited_tag': f'is_favorited=1&tags={first}',
+        'recipes_cart_tag_author': (
+            f'is_in_shopping_cart=1&tags={first}&author={author}'
+        ),
+        'recipes_search': 'search=рецепт',
+    }
+    scenarios = [
+        Scenario(name, 'get', f'/api/recipes/?limit=6&{query}')
+        for name, query in filters.items()
+    ]
+    scenarios += [
+        Scenario('recipes_list_anonymous', 'get', '/api/recipes/',
+                 authenticated=False),
+        Scenario('recipe_detail', 'get', f'/api/recipes/{recipe}/'),
+        Scenario('ingredients_autocomplete', 'get',
+                 '/api/ingredients/?name=бенч'),
+        Scenario('tags_list', 'get', '/api/tags/'),
+        Scenario('subscriptions', 'get',
+                 '/api/users/subscriptions/?recipes_limit=3'),
+        Scenario('favorite_toggle', 'post',
+                 f'/api/recipes/{toggled}/favorite/',
+                 undo=f'/api/recipes/{toggled}/favorite/'),
+        Scenario('shopping_cart_toggle', 'post',
+                 f'/api/recipes/{toggled}/shopping_cart/',
+                 undo=f'/api/recipes/{toggled}/shopping_cart/'),
+        Scenario('download_shopping_cart_pdf', 'get',
+                 '/api/recipes/download_shopping_cart/?format=pdf'),
+        Scenario('download_shopping_cart_pdf_uncached', 'get',
+                 '/api/recipes/download_shopping_cart/?format=pdf',
+                 cold=True),
+        Scenario('download_shopping_cart_txt', 'get',
+                 '/api/recipes/download_shopping_cart/?format=txt'),
+    ]
+    return scenarios
+
+
+class QueryCounter:
+    """Считает SQL-запросы через connection.execute_wrapper."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def run_scenario(client, scenario, headers, iterations, warmup):
+    """Возвращает p50/p95 в миллисекундах и число запросов к БД."""
+    request_headers = headers if scenario.authenticated else {}
+    timings, queries = [], []
+    for iteration in range(warmup + iterations):
+        if scenario.cold:
+            shopping_lists_cache.clear()
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            response = getattr(client, scenario.method)(
+                scenario.url, **request_headers
+            )
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise RuntimeError(
+                f'{scenario.name}: {scenario.url} вернул '
+                f'{response.status_code}'
+            )
+        if scenario.undo:
+            client.delete(scenario.undo, **request_headers)
+        if iteration >= warmup:
+            timings.append(elapsed * 1000)
+            queries.append(counter.count)
+    return {
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'queries': max(queries),
+    }
+
+
+def auth_headers(user):
+    token, _ = Token.objects.get_or_create(user=user)
+    return {'HTTP_AUTHORIZATION': f'Token {token.key}'}
@@ -3,6 +3,10 @@ import base64
 from django.core.files.base import ContentFile
 from rest_framework import serializers
 
+from recipes.constants import IMAGE_RENDITION_FORMATS
+
+FALLBACK_FORMAT = IMAGE_RENDITION_FORMATS[-1]
+
 
 class Base64ImageField(serializers.ImageField):
     def to_internal_value(self, data):
@@ -12,3 +16,77 @@ class Base64ImageField(serializers.ImageField):
             data = ContentFile(base64.b64decode(imgstr), name='temp.' + ext)
 
         return super().to_internal_value(data)
+
+
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Связь по id из справочника ``reference``; промах проверяется в БД."""
+
+    def __init__(self, reference, **kwargs):
+        self.reference = reference
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        instance = self.reference.get_object(pk)
+        if instance is None:
+            instance = self.get_queryset().filter(pk=pk).first()
+            if instance is None:
+                self.fail('does_not_exist', pk_value=data)
+            self.reference.expire()
+        return instance
+
+
+class ImageRenditionsField(serializers.Field):
+    """Ссылки на оригинал и уменьшенные копии изображения.
+
+    Каждый размер — объект со ссылкой ``url``; у уменьшенных копий есть
+    ещё ширина и ссылки по форматам (``url`` ведёт на JPEG). В ``srcset``
+    — готовые строки для атрибута ``srcset`` тега ``img``.
+    """
+
+    def __init__(self, image_field, renditions_field, **kwargs):
+        self.image_field = image_field
+        self.renditions_field = renditions_field
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def build_url(self, url):
+        request = self.context.get('request')
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+    def to_representation(self, instance):
+        image = getattr(instance, self.image_field)
+        if not image:
+            return None
+        storage = image.storage
+        renditions = getattr(instance, self.renditions_field) or {}
+        sizes = {'original': {'url': self.build_url(image.url)}}
+        srcset = {}
+        renditions = sorted(
+            (item for item in renditions.items() if item[0] != 'source'),
+            key=lambda item: item[1]['width']
+        )
+        for label, rendition in renditions:
+            sizes[label] = {'width': rendition['width']}
+            for image_format, path in rendition.items():
+                if image_format == 'width':
+                    continue
+                url = self.build_url(storage.url(path))
+                sizes[label][image_format] = url
+                srcset.setdefault(image_format, []).append(
+                    f'{url} {rendition["width"]}w'
+                )
+            sizes[label]['url'] = sizes[label].get(FALLBACK_FORMAT)
+        sizes['srcset'] = {
+            image_format: ', '.join(candidates)
+            for image_format, candidates in srcset.items()
+        }
+        return sizes
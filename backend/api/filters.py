@@ -1,41 +1,78 @@
+from django import forms
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Exists, F, OuterRef
 from django_filters import rest_framework as filters
 
-from recipes.models import Ingredients, Recipes, Tags
+from api.reference import tags_reference
+from myprofile.models import Favorite, ShoppingCartItem
+from recipes.constants import SEARCH_CONFIGS
+from recipes.models import Recipes
 
 
-class IngredientsFilter(filters.FilterSet):
+class AnyValuesField(forms.MultipleChoiceField):
+    """Несколько значений параметра без проверки по списку вариантов."""
 
-    name = filters.CharFilter(lookup_expr='istartswith')
+    def valid_value(self, value):
+        return True
 
-    class Meta:
-        model = Ingredients
-        fields = ('name',)
+
+class MultipleValuesFilter(filters.MultipleChoiceFilter):
+    field_class = AnyValuesField
 
 
 class RecipesFilter(filters.FilterSet):
-    tags = filters.ModelMultipleChoiceFilter(
-        queryset=Tags.objects.all(),
-        field_name='tags__slug',
-        to_field_name='slug',
-        lookup_expr='exact'
-    )
+    tags = MultipleValuesFilter(method='filter_tags')
     is_favorited = filters.BooleanFilter(method='filter_is_favorited',)
     is_in_shopping_cart = filters.BooleanFilter(
         method='filter_is_in_shopping_list',
     )
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Recipes
-        fields = ('is_favorited', 'author', 'is_in_shopping_cart', 'tags')
+        fields = (
+            'is_favorited', 'author', 'is_in_shopping_cart', 'tags', 'search'
+        )
+
+    def filter_tags(self, queryset, name, value):
+        """Рецепты хотя бы с одним из тегов, без дублей строк.
+
+        Неизвестные slug не считаются ошибкой: рецептов с ними просто нет.
+        """
+        return queryset.filter(Exists(
+            Recipes.tags.through.objects.filter(
+                recipes=OuterRef('pk'),
+                tags__in=tags_reference.ids_for_slugs(value),
+            )
+        ))
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию рецепта."""
+        if not value:
+            return queryset
+
+        search_query = None
+        for config in SEARCH_CONFIGS:
+            config_query = SearchQuery(
+                value, config=config, search_type='websearch'
+            )
+            search_query = (
+                config_query if search_query is None
+                else search_query | config_query
+            )
+        return queryset.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F('search_vector'), search_query)
+        ).order_by('-rank', '-created_at')
 
     def filter_is_favorited(self, queryset, name, value):
         if value is None:
             return queryset
 
         if self.request.user.is_authenticated:
-            if value:
-                return queryset.filter(favorited_by=self.request.user)
-            return queryset.exclude(favorited_by=self.request.user)
+            favorited = Exists(Favorite.objects.filter(
+                user=self.request.user, recipe=OuterRef('pk')
+            ))
+            return queryset.filter(favorited if value else ~favorited)
 
         return queryset
 
@@ -44,8 +81,9 @@ class RecipesFilter(filters.FilterSet):
             return queryset
 
         if self.request.user.is_authenticated:
-            if value:
-                return queryset.filter(in_shopping_cart=self.request.user)
-            return queryset.exclude(in_shopping_cart=self.request.user)
+            in_cart = Exists(ShoppingCartItem.objects.filter(
+                user=self.request.user, recipe=OuterRef('pk')
+            ))
+            return queryset.filter(in_cart if value else ~in_cart)
 
         return queryset
@@ -0,0 +1,147 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+
+from api.benchmarks import auth_headers, build_scenarios, run_scenario, seed
+
+DEFAULT_BASELINE = os.path.join(
+    settings.BASE_DIR, 'benchmarks', 'baseline.json'
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """Замер задержки и числа SQL-запросов на горячих эндпоинтах API.
+
+    Данные создаются внутри транзакции, которая откатывается в конце,
+    поэтому команду можно запускать на локальной рабочей БД. Рост числа
+    SQL-запросов относительно JSON-базы всегда считается регрессией.
+    Задержка зависит от машины и сравнивается только с ``--check-latency``.
+    """
+
+    help = 'Бенчмарк эндпоинтов API с проверкой регрессий по базовой линии'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--recipes', type=int, default=500)
+        parser.add_argument(
+            '--only', nargs='*',
+            help='Запустить только перечисленные сценарии.'
+        )
+        parser.add_argument(
+            '--baseline', default=DEFAULT_BASELINE,
+            help='JSON-файл с базовыми результатами.'
+        )
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Записать результаты как новую базовую линию.'
+        )
+        parser.add_argument(
+            '--check-latency', action='store_true',
+            help='Считать регрессией и рост p95 сверх допуска.'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Допустимый относительный рост p95 (0.25 = 25%%).'
+        )
+        parser.add_argument(
+            '--min-slack-ms', type=float, default=5.0,
+            help='Допустимый рост p95 в миллисекундах не меньше этого.'
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        try:
+            with transaction.atomic(), override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']
+            ):
+                results = self.measure(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+        if options['save_baseline']:
+            os.makedirs(os.path.dirname(options['baseline']), exist_ok=True)
+            with open(options['baseline'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, indent=2, sort_keys=True)
+                file.write('\n')
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Базовая линия записана в {options["baseline"]}.'
+                )
+            )
+            return
+        self.compare(results, options)
+
+    def measure(self, options):
+        user, profiles, tags, recipes = seed(
+            users=options['users'], recipes=options['recipes']
+        )
+        headers = auth_headers(user)
+        client = Client()
+        results = {}
+        for scenario in build_scenarios(user, profiles, tags, recipes):
+            if options['only'] and scenario.name not in options['only']:
+                continue
+            result = run_scenario(
+                client, scenario, headers,
+                options['iterations'], options['warmup']
+            )
+            results[scenario.name] = result
+            self.stdout.write(
+                f'{scenario.name:<36} p50 {result["p50_ms"]:>8.2f} ms  '
+                f'p95 {result["p95_ms"]:>8.2f} ms  '
+                f'SQL {result["queries"]:>3}'
+            )
+        return results
+
+    def compare(self, results, options):
+        baseline_path = options['baseline']
+        try:
+            with open(baseline_path, encoding='utf-8') as file:
+                baseline = json.load(file)
+        except FileNotFoundError:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'Базовая линия {baseline_path} не найдена, '
+                    'сравнение пропущено.'
+                )
+            )
+            return
+
+        regressions = []
+        for name, result in results.items():
+            expected = baseline.get(name)
+            if expected is None:
+                continue
+            if result['queries'] > expected['queries']:
+                regressions.append(
+                    f'{name}: SQL {expected["queries"]} -> '
+                    f'{result["queries"]}'
+                )
+            slack = max(
+                expected['p95_ms'] * options['tolerance'],
+                options['min_slack_ms'],
+            )
+            if (
+                options['check_latency']
+                and result['p95_ms'] > expected['p95_ms'] + slack
+            ):
+                regressions.append(
+                    f'{name}: p95 {expected["p95_ms"]} -> '
+                    f'{result["p95_ms"]} ms'
+                )
+        if regressions:
+            raise CommandError(
+                'Обнаружены регрессии:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий не обнаружено.'))
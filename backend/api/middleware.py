@@ -0,0 +1,247 @@
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework import viewsets
+from rest_framework.permissions import SAFE_METHODS
+
+from api.db_routers import read_from_replica
+
+logger = logging.getLogger('api.performance')
+
+request_timings = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Счётчики одного запроса: SQL, сериализация и рендеринг."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.view_started = None
+        self.render_started = None
+        self.render_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+    def start_view(self):
+        self.view_started = (time.perf_counter(), self.db_time)
+
+    def finish_view(self):
+        if self.view_started is None:
+            return
+        started, db_time = self.view_started
+        self.view_started = None
+        self.serialize_time += max(
+            time.perf_counter() - started - (self.db_time - db_time), 0
+        )
+
+    @contextmanager
+    def capture_queries(self):
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(self))
+            yield
+
+
+class ServerTimingMixin:
+    """Время обработчика вьюсета без SQL — сериализация ответа.
+
+    Замер идёт от конца проверок доступа до ``finalize_response``, если
+    запрос проходит через ``ServerTimingMiddleware``.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        timings = request_timings.get()
+        if timings is not None:
+            timings.start_view()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        timings = request_timings.get()
+        if timings is not None:
+            timings.finish_view()
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class ServerTimingMiddleware:
+    """Заголовок Server-Timing с временем SQL, сериализации и рендеринга.
+
+    Включается настройкой ``SERVER_TIMING_ENABLED``. Запросы, в которых
+    больше ``SERVER_TIMING_SLOW_QUERIES`` SQL-запросов или которые идут
+    дольше ``SERVER_TIMING_SLOW_MS``, пишутся в лог ``api.performance``
+    одной JSON-строкой. У потоковых ответов заголовок описывает работу
+    до отправки тела, а в лог попадает и время его генерации.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_queries = settings.SERVER_TIMING_SLOW_QUERIES
+        self.slow_ms = settings.SERVER_TIMING_SLOW_MS
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            with timings.capture_queries():
+                response = self.get_response(request)
+        finally:
+            request_timings.reset(token)
+        total = (time.perf_counter() - started) * 1000
+
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={timings.db_time * 1000:.1f};'
+            f'desc="{timings.queries} queries"',
+            f'serialize;dur={timings.serialize_time * 1000:.1f}',
+            f'render;dur={timings.render_time * 1000:.1f}',
+            f'total;dur={total:.1f}',
+        ))
+        if response.streaming and not response.is_async:
+            response.streaming_content = self.measure_streaming_content(
+                response.streaming_content, request, response, timings,
+                started
+            )
+        else:
+            self.log_slow_request(request, response, timings, total)
+        return response
+
+    def measure_streaming_content(self, content, request, response,
+                                  timings, started):
+        content = iter(content)
+        try:
+            while True:
+                with timings.capture_queries():
+                    try:
+                        chunk = next(content)
+                    except StopIteration:
+                        break
+                yield chunk
+        finally:
+            total = (time.perf_counter() - started) * 1000
+            self.log_slow_request(request, response, timings, total)
+
+    def log_slow_request(self, request, response, timings, total):
+        if timings.queries <= self.slow_queries and total <= self.slow_ms:
+            return
+        logger.warning(json.dumps({
+            'event': 'slow_request',
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'user_id': getattr(getattr(request, 'user', None), 'id', None),
+            'queries': timings.queries,
+            'db_ms': round(timings.db_time * 1000, 1),
+            'serialize_ms': round(timings.serialize_time * 1000, 1),
+            'render_ms': round(timings.render_time * 1000, 1),
+            'total_ms': round(total, 1),
+        }, ensure_ascii=False))
+
+    def process_template_response(self, request, response):
+        timings = request_timings.get()
+        if timings is not None:
+            timings.render_started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: self.finish_render(timings)
+            )
+        return response
+
+    @staticmethod
+    def finish_render(timings):
+        timings.render_time += time.perf_counter() - timings.render_started
+
+
+class ReplicaRoutingMiddleware:
+    """Направляет чтение вьюсетов API на реплику БД.
+
+    Включается, если настроена реплика (``REPLICA_DATABASE``). На реплику
+    уходят только безопасные запросы к вьюсетам приложения ``api``. После
+    успешного изменяющего запроса клиент получает cookie, и в течение
+    ``REPLICA_STICKY_SECONDS`` секунд его чтение идёт с основной БД, чтобы
+    он сразу видел свои изменения несмотря на отставание реплики.
+    """
+
+    cookie_name = 'db_primary_until'
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sticky_seconds = settings.REPLICA_STICKY_SECONDS
+
+    def __call__(self, request):
+        token = read_from_replica.set(False)
+        try:
+            response = self.get_response(request)
+            replica = read_from_replica.get()
+        finally:
+            read_from_replica.reset(token)
+        if response.streaming and not response.is_async:
+            response.streaming_content = self.route_streaming_content(
+                response.streaming_content, replica
+            )
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and self.sticky_seconds
+        ):
+            response.set_cookie(
+                self.cookie_name,
+                str(int(time.time()) + self.sticky_seconds),
+                max_age=self.sticky_seconds,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            request.method in SAFE_METHODS
+            and self.is_api_viewset(view_func)
+            and not self.is_sticky(request)
+        ):
+            read_from_replica.set(True)
+
+    @staticmethod
+    def route_streaming_content(content, replica):
+        """Тело потокового ответа читается из той же БД, что и во view."""
+        content = iter(content)
+        while True:
+            token = read_from_replica.set(replica)
+            try:
+                chunk = next(content)
+            except StopIteration:
+                return
+            finally:
+                read_from_replica.reset(token)
+            yield chunk
+
+    @staticmethod
+    def is_api_viewset(view_func):
+        view_class = getattr(view_func, 'cls', None)
+        return (
+            view_class is not None
+            and issubclass(view_class, viewsets.ViewSetMixin)
+            and view_class.__module__.split('.')[0] == 'api'
+        )
+
+    def is_sticky(self, request):
+        try:
+            until = int(request.COOKIES[self.cookie_name])
+        except (KeyError, ValueError):
+            return False
+        return until > time.time()
@@ -1,6 +1,122 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination, replace_query_param
+from rest_framework.response import Response
 
 
 class CustomPageLimitPagination(PageNumberPagination):
     """Пагинатор с возможностью ограничения вывода рецептов на странице."""
     page_size_query_param = 'limit'
+
+
+class RecipesPagination(CustomPageLimitPagination):
+    """Пагинатор рецептов с дополнительным keyset-режимом.
+
+    Если в запросе есть параметр ``cursor`` (даже пустой), страница
+    выбирается по ключу ``(created_at, id)`` без ``COUNT(*)`` и ``OFFSET``,
+    а в ответе вместо номеров страниц отдаются непрозрачные курсоры.
+    Без параметра поведение не отличается от обычной пагинации. С поиском
+    курсор не сочетается: результаты поиска упорядочены по релевантности.
+    """
+    cursor_query_param = 'cursor'
+    search_query_param = 'search'
+    invalid_cursor_message = 'Неверный курсор.'
+    cursor_with_search_message = (
+        'Курсор нельзя сочетать с поиском, используйте page.'
+    )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        if request.query_params.get(self.search_query_param):
+            raise ValidationError(
+                {self.cursor_query_param: [self.cursor_with_search_message]}
+            )
+        self.request = request
+        self.limit = self.get_page_size(request)
+        position, reverse = self.decode_cursor(
+            request.query_params[self.cursor_query_param]
+        )
+        if reverse:
+            queryset = queryset.order_by('created_at', 'id')
+        else:
+            queryset = queryset.order_by('-created_at', '-id')
+        if position is not None:
+            created_at, pk = position
+            if reverse:
+                queryset = queryset.filter(
+                    Q(created_at__gte=created_at)
+                    & ~Q(created_at=created_at, id__lte=pk)
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__lte=created_at)
+                    & ~Q(created_at=created_at, id__gte=pk)
+                )
+
+        rows = list(queryset[:self.limit + 1])
+        has_more = len(rows) > self.limit
+        self.page = rows[:self.limit]
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self.build_cursor_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self.build_cursor_link(self.page[0], reverse=True)
+
+    def build_cursor_link(self, recipe, reverse):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(recipe, reverse)
+        )
+
+    @staticmethod
+    def encode_cursor(recipe, reverse):
+        raw = f'{recipe.created_at.isoformat()}|{recipe.id}|{int(reverse)}'
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, encoded):
+        if not encoded:
+            return None, False
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode()).decode()
+            created_at, pk, reverse = raw.split('|')
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+            reverse = bool(int(reverse))
+        except (TypeError, ValueError, UnicodeDecodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return (created_at, pk), reverse
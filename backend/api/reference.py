@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, router
+
+from recipes.models import Tags
+
+REFERENCE_CACHE_TTL = getattr(settings, 'REFERENCE_CACHE_TTL', 300)
+REFERENCE_VERSION_CHECK_INTERVAL = getattr(
+    settings, 'REFERENCE_VERSION_CHECK_INTERVAL', 1
+)
+
+logger = logging.getLogger(__name__)
+
+reference_caches = []
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    """Снимок справочника: готовый ответ API и словари для поиска."""
+    payload: list
+    by_id: dict
+    by_slug: dict = field(default_factory=dict)
+
+
+class VersionedCache:
+    """Справочник в памяти процесса, сверяемый с общей версией.
+
+    Версия хранится в кэше Django и увеличивается сигналами после
+    коммита изменений модели. Версия читается не чаще раза в
+    ``check_interval`` секунд, и данные перечитываются, если она
+    сменилась или истёк TTL. С общим
+    бэкендом кэша сброс сразу виден всем воркерам, с локальным остальные
+    воркеры подхватят изменения не позже чем через TTL.
+    """
+
+    name = None
+    model = None
+
+    def __init__(self, ttl=REFERENCE_CACHE_TTL,
+                 check_interval=REFERENCE_VERSION_CHECK_INTERVAL):
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._data = None
+        self._version = None
+        self._loaded_at = 0
+        self._checked_at = 0
+        reference_caches.append(self)
+
+    def __deepcopy__(self, memo):
+        # DRF копирует аргументы полей для каждого сериализатора, а
+        # справочник должен оставаться общим на процесс.
+        return self
+
+    @property
+    def version_key(self):
+        return f'reference:{self.name}:version'
+
+    def load(self):
+        raise NotImplementedError
+
+    def invalidate(self):
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, 1, timeout=None)
+        self.expire()
+
+    def expire(self):
+        """Сбрасывает снимок только в этом процессе, не трогая версию."""
+        with self._lock:
+            self._data = None
+
+    def _is_stale(self, version):
+        return (
+            self._data is None
+            or version != self._version
+            or (self.ttl and time.monotonic() - self._loaded_at > self.ttl)
+        )
+
+    def get(self):
+        data = self._data
+        now = time.monotonic()
+        if data is not None and now - self._checked_at < self.check_interval:
+            return data
+        version = cache.get(self.version_key, 0)
+        if self._is_stale(version):
+            with self._lock:
+                if self._is_stale(version):
+                    self._data = self.load()
+                    self._version = version
+                    self._loaded_at = time.monotonic()
+                data = self._data
+        self._checked_at = now
+        return data
+
+    def all(self):
+        return self.get().payload
+
+    def get_object(self, pk):
+        """Экземпляр модели по id из справочника или None."""
+        row = self.get().by_id.get(pk)
+        if row is None:
+            return None
+        return self.model.from_db(
+            router.db_for_write(self.model), list(row), list(row.values())
+        )
+
+
+class TagsReference(VersionedCache):
+    name = 'tags'
+    model = Tags
+
+    def load(self):
+        payload = list(
+            Tags.objects.order_by('id').values('id', 'name', 'slug')
+        )
+        return ReferenceData(
+            payload=payload,
+            by_id={row['id']: row for row in payload},
+            by_slug={row['slug']: row['id'] for row in payload},
+        )
+
+    def ids_for_slugs(self, slugs):
+        """id тегов по slug; неизвестные slug пропускаются."""
+        by_slug = self.get().by_slug
+        ids = [by_slug[slug] for slug in slugs if slug in by_slug]
+        missing = [slug for slug in slugs if slug not in by_slug]
+        if missing:
+            found = list(
+                Tags.objects.filter(slug__in=missing)
+                .values_list('id', flat=True)
+            )
+            if found:
+                self.expire()
+            ids += found
+        return ids
+
+
+tags_reference = TagsReference()
+
+
+def prewarm_reference_data():
+    """Заранее загружает справочники, если включено REFERENCE_CACHE_PREWARM.
+
+    Ошибка БД при старте не мешает запуску: справочник загрузится при
+    первом обращении.
+    """
+    if not getattr(settings, 'REFERENCE_CACHE_PREWARM', False):
+        return
+    for reference in reference_caches:
+        try:
+            reference.get()
+        except DatabaseError:
+            logger.warning(
+                'Не удалось заранее загрузить справочник %s.', reference.name
+            )
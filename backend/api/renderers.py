@@ -0,0 +1,98 @@
+import csv
+import json
+from io import StringIO
+
+from rest_framework import renderers
+
+from api.utils import render_shopping_list_pdf
+
+SHOPPING_LIST_TITLE = 'Список покупок'
+
+
+class ShoppingListRenderer(renderers.BaseRenderer):
+    """Базовый рендерер списка покупок.
+
+    Получает агрегированные строки с ключами ``name``,
+    ``measurement_unit`` и ``total_amount`` и отдаёт файл по строкам через
+    ``stream``. Рендереры с ``cacheable`` собирают файл целиком в
+    ``render_content``. Ошибки API, пришедшие в этот рендерер, отдаются
+    как JSON.
+    """
+    charset = 'utf-8'
+    cacheable = False
+    filename = 'shopping_cart'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if response is not None and response.exception:
+            response['Content-Type'] = 'application/json'
+            return renderers.JSONRenderer().render(data)
+        return b''.join(self.stream(data))
+
+    def stream(self, rows):
+        raise NotImplementedError
+
+    @property
+    def content_type(self):
+        if self.charset:
+            return f'{self.media_type}; charset={self.charset}'
+        return self.media_type
+
+    @property
+    def attachment_name(self):
+        return f'{self.filename}.{self.format}'
+
+
+class PDFShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
+    cacheable = True
+
+    def render_content(self, rows):
+        return render_shopping_list_pdf(rows)
+
+    def stream(self, rows):
+        yield self.render_content(rows)
+
+
+class TextShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def stream(self, rows):
+        yield f'{SHOPPING_LIST_TITLE}\n\n'.encode()
+        for row in rows:
+            yield (
+                f'{row["name"]} ({row["measurement_unit"]}): '
+                f'{row["total_amount"]}\n'
+            ).encode()
+
+
+class CSVShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    header = ('name', 'measurement_unit', 'total_amount')
+
+    def stream(self, rows):
+        yield self.render_line(self.header)
+        for row in rows:
+            yield self.render_line([row[field] for field in self.header])
+
+    @staticmethod
+    def render_line(values):
+        line = StringIO()
+        csv.writer(line).writerow(values)
+        return line.getvalue().encode()
+
+
+class JSONShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'application/json'
+    format = 'json'
+
+    def stream(self, rows):
+        separator = b'['
+        for row in rows:
+            yield separator + json.dumps(row, ensure_ascii=False).encode()
+            separator = b','
+        yield b'[]' if separator == b'[' else b']'
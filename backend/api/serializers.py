@@ -1,15 +1,28 @@
 import re
 
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 
-from api.fields import Base64ImageField
-from myprofile.models import MyProfile, Subscription
-from recipes.constants import MIN_INGREDIENTS_AMOUNT
+from api.autocomplete import ingredients_index
+from api.fields import (
+    Base64ImageField,
+    CachedPrimaryKeyRelatedField,
+    ImageRenditionsField,
+)
+from api.reference import tags_reference
+from myprofile.models import (
+    Favorite,
+    MyProfile,
+    ShoppingCartItem,
+    Subscription,
+)
+from recipes.constants import BULK_RECIPES_LIMIT, MIN_INGREDIENTS_AMOUNT
 from recipes.models import Ingredients, RecipeIngredients, Recipes, Tags
 
 
 class UserSerializer(serializers.ModelSerializer):
     avatar = Base64ImageField(required=False, allow_null=True)
+    avatar_sizes = ImageRenditionsField('avatar', 'avatar_renditions')
     is_subscribed = serializers.SerializerMethodField()
 
     class Meta:
@@ -21,6 +34,7 @@ class UserSerializer(serializers.ModelSerializer):
             'username',
             'email',
             'avatar',
+            'avatar_sizes',
             'is_subscribed'
         )
 
@@ -28,10 +42,13 @@ class UserSerializer(serializers.ModelSerializer):
         if 'avatar' not in validated_data:
             raise serializers.ValidationError('Аватар не должен быть пустым')
         instance.avatar = validated_data.get('avatar', instance.avatar)
-        instance.save()
+        instance.save(update_fields=('avatar',))
         return instance
 
     def get_is_subscribed(self, obj):
+        annotated = getattr(obj, 'is_author_subscribed', None)
+        if annotated is not None:
+            return annotated
         request = self.context.get('request')
         if request is not None and request.user.is_authenticated:
             return Subscription.objects.filter(
@@ -79,15 +96,26 @@ class ChangePasswordSerializer(serializers.Serializer):
         return data
 
 
+class RecipeIdsSerializer(serializers.Serializer):
+    """Список id рецептов для массового добавления и удаления."""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BULK_RECIPES_LIMIT,
+    )
+
+
 class ShortRecipesSerializer(serializers.ModelSerializer):
     """Сериализатор отображения рецептов у подписчиков."""
     image = Base64ImageField(required=False, allow_null=True)
+    image_sizes = ImageRenditionsField('image', 'image_renditions')
 
     class Meta:
         model = Recipes
         fields = (
             'id',
             'image',
+            'image_sizes',
             'name',
             'cooking_time'
         )
@@ -96,7 +124,7 @@ class ShortRecipesSerializer(serializers.ModelSerializer):
 class UserSerializerWithRecipes(UserSerializer):
     avatar = Base64ImageField(read_only=True)
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
+    recipes_count = serializers.ReadOnlyField()
     is_subscribed = serializers.SerializerMethodField()
 
     class Meta:
@@ -108,31 +136,22 @@ class UserSerializerWithRecipes(UserSerializer):
             'username',
             'email',
             'avatar',
+            'avatar_sizes',
             'is_subscribed',
             'recipes',
             'recipes_count'
         )
 
-    def get_recipes_count(self, obj):
-        return obj.recipes.count()
-
     def get_recipes(self, obj):
-        request = self.context.get('request')
-        limit = request.GET.get('recipes_limit') if request else None
-        queryset = Recipes.objects.filter(author=obj.id)
-        if limit and limit.isdigit():
-            queryset = queryset[:int(limit)]
+        queryset = getattr(obj, 'recipes_preview', None)
+        if queryset is None:
+            request = self.context.get('request')
+            limit = request.GET.get('recipes_limit') if request else None
+            queryset = Recipes.objects.filter(author=obj.id)
+            if limit and limit.isdigit():
+                queryset = queryset[:int(limit)]
         return ShortRecipesSerializer(queryset, many=True).data
 
-    def get_is_subscribed(self, obj):
-        request = self.context.get('request')
-        if request is not None and request.user.is_authenticated:
-            return Subscription.objects.filter(
-                subscriber=request.user,
-                subscribe_to=obj
-            ).exists()
-        return False
-
 
 class SubscriptionSerializer(serializers.ModelSerializer):
     subscribe_to = UserSerializerWithRecipes(read_only=True)
@@ -164,7 +183,9 @@ class IngredientsSerializer(serializers.ModelSerializer):
 
 class RecipeIngredientSerializerForCreate(serializers.ModelSerializer):
     """Для добавления ингридиентов в рецепт."""
-    id = serializers.PrimaryKeyRelatedField(queryset=Ingredients.objects.all())
+    id = CachedPrimaryKeyRelatedField(
+        ingredients_index, queryset=Ingredients.objects.all()
+    )
 
     class Meta:
         model = RecipeIngredients
@@ -195,8 +216,8 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
 class RecipesCreateUpdateSerializer(serializers.ModelSerializer):
     """Сериализатор для создания и обновления рецептов."""
     image = Base64ImageField()
-    tags = serializers.PrimaryKeyRelatedField(
-        queryset=Tags.objects.all(), many=True
+    tags = CachedPrimaryKeyRelatedField(
+        tags_reference, queryset=Tags.objects.all(), many=True
     )
     ingredients = RecipeIngredientSerializerForCreate(many=True)
 
@@ -231,6 +252,21 @@ class RecipesCreateUpdateSerializer(serializers.ModelSerializer):
 
         return ingredients
 
+    def save(self, **kwargs):
+        """Сохраняет рецепт в транзакции.
+
+        Теги и ингредиенты проверяются по справочникам в памяти процесса,
+        и удалённый за это время объект даёт ошибку внешнего ключа при
+        коммите; она возвращается как ошибка валидации, а не 500.
+        """
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                'Некоторые теги или ингредиенты не найдены.'
+            )
+
     def create(self, validated_data):
         ingredients_data = validated_data.pop('ingredients')
         tags_data = validated_data.pop('tags')
@@ -253,12 +289,13 @@ class RecipesCreateUpdateSerializer(serializers.ModelSerializer):
         ingredients_data = validated_data.pop('ingredients', None)
         tags_data = validated_data.pop('tags', None)
         instance = super().update(instance, validated_data)
-        RecipeIngredients.objects.filter(recipe=instance).delete()
         instance.tags.set(tags_data)
-        self._create_ingredients(instance, ingredients_data)
+        self._update_ingredients(instance, ingredients_data)
         return instance
 
     def _create_ingredients(self, recipe, ingredients_data):
+        if not ingredients_data:
+            return
         ingredients = [
             RecipeIngredients(
                 recipe=recipe,
@@ -268,6 +305,35 @@ class RecipesCreateUpdateSerializer(serializers.ModelSerializer):
         ]
         RecipeIngredients.objects.bulk_create(ingredients)
 
+    def _update_ingredients(self, recipe, ingredients_data):
+        """Приводит ингредиенты рецепта к присланным, меняя только разницу.
+
+        Новые строки добавляются, у существующих обновляется количество,
+        отсутствующие в запросе удаляются; неизменные строки не трогаются.
+        """
+        current = {
+            item.ingredient_id: item
+            for item in RecipeIngredients.objects.filter(recipe=recipe)
+        }
+        submitted = {item['id'].id: item for item in ingredients_data}
+        changed = []
+        for ingredient_id, item in submitted.items():
+            row = current.get(ingredient_id)
+            if row is not None and row.amount != item['amount']:
+                row.amount = item['amount']
+                changed.append(row)
+        removed = current.keys() - submitted.keys()
+        if removed:
+            RecipeIngredients.objects.filter(
+                recipe=recipe, ingredient_id__in=removed
+            ).delete()
+        if changed:
+            RecipeIngredients.objects.bulk_update(changed, ('amount',))
+        self._create_ingredients(recipe, [
+            item for ingredient_id, item in submitted.items()
+            if ingredient_id not in current
+        ])
+
     def to_representation(self, instance):
         return RecipesSerializer(instance, context=self.context).data
 
@@ -275,6 +341,7 @@ class RecipesCreateUpdateSerializer(serializers.ModelSerializer):
 class RecipesSerializer(serializers.ModelSerializer):
     """Сериализатор для работы с рецептами."""
     image = Base64ImageField(required=False, allow_null=True)
+    image_sizes = ImageRenditionsField('image', 'image_renditions')
     author = UserSerializer(read_only=True)
     tags = TagsSerializer(many=True)
     ingredients = RecipeIngredientSerializer(
@@ -294,22 +361,37 @@ class RecipesSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'image_sizes',
             'text',
             'cooking_time'
         )
 
+    def to_representation(self, instance):
+        annotated = getattr(instance, 'is_author_subscribed', None)
+        if annotated is not None:
+            instance.author.is_author_subscribed = annotated
+        return super().to_representation(instance)
+
     def get_is_favorited(self, obj):
+        annotated = getattr(obj, 'is_favorited', None)
+        if annotated is not None:
+            return annotated
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return request.user.favorite_recipes.filter(id=obj.id).exists()
+            return Favorite.objects.filter(
+                user=request.user, recipe=obj
+            ).exists()
 
         return False
 
     def get_is_in_shopping_cart(self, obj):
+        annotated = getattr(obj, 'is_in_shopping_cart', None)
+        if annotated is not None:
+            return annotated
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return request.user.shopping_cart_recipes.filter(
-                id=obj.id
+            return ShoppingCartItem.objects.filter(
+                user=request.user, recipe=obj
             ).exists()
 
         return False
@@ -0,0 +1,25 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.autocomplete import ingredients_index
+from api.reference import tags_reference
+from api.utils import short_links_cache
+from recipes.models import Ingredients, Recipes, Tags
+from recipes.short_links import encode_short_link
+
+
+@receiver((post_save, post_delete), sender=Ingredients)
+def invalidate_ingredients_index(sender, **kwargs):
+    transaction.on_commit(ingredients_index.invalidate)
+
+
+@receiver((post_save, post_delete), sender=Tags)
+def invalidate_tags_reference(sender, **kwargs):
+    transaction.on_commit(tags_reference.invalidate)
+
+
+@receiver(post_delete, sender=Recipes)
+def forget_short_links(sender, instance, **kwargs):
+    codes = {encode_short_link(instance.pk), instance.short_code}
+    transaction.on_commit(lambda: short_links_cache.delete(*codes))
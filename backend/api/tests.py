@@ -0,0 +1,202 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    connection,
+    connections,
+    router,
+    transaction,
+)
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.benchmarks import auth_headers, seed
+from api.db_routers import read_from_replica
+from recipes.models import Recipes
+
+
+def used_indexes(plan):
+    """Имена индексов во всех узлах плана EXPLAIN (FORMAT JSON)."""
+    names = set()
+    nodes = [plan]
+    while nodes:
+        node = nodes.pop()
+        if 'Index Name' in node:
+            names.add(node['Index Name'])
+        nodes.extend(node.get('Plans', ()))
+    return names
+
+
+@skipUnless(
+    connection.vendor == 'postgresql', 'Планы проверяются на PostgreSQL.'
+)
+class RecipesQueryPlansTest(TestCase):
+    """Запросы страницы списка рецептов идут по своим индексам.
+
+    Проверяется ровно тот SQL, который выполняет RecipesViewSet: он
+    перехватывается во время запроса к API и передаётся в EXPLAIN.
+    Последовательное сканирование отключается: на маленькой тестовой БД
+    планировщик иначе предпочёл бы его любому индексу, а проверить нужно,
+    что индекс вообще подходит запросу.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, profiles, _, _ = seed(users=5, recipes=60, ingredients=20)
+        cls.author = profiles[1]
+        cls.headers = auth_headers(cls.user)
+
+    def get_page_query(self, url, **headers):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, 200)
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "recipes_recipes"' in query['sql']
+            and 'LIMIT' in query['sql']
+            and 'COUNT(' not in query['sql']
+        ]
+        self.assertEqual(len(queries), 1, queries)
+        return response, queries[0]
+
+    def assertUsesIndex(self, sql, index):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+            plan = cursor.fetchone()[0][0]['Plan']
+        self.assertIn(index, used_indexes(plan), sql)
+
+    def test_list_page(self):
+        _, sql = self.get_page_query('/api/recipes/?limit=6&page=2')
+        self.assertUsesIndex(sql, 'recipes_created_idx')
+
+    def test_list_page_authenticated(self):
+        _, sql = self.get_page_query('/api/recipes/?limit=6', **self.headers)
+        self.assertUsesIndex(sql, 'recipes_created_idx')
+
+    def test_list_cursor_next_and_previous(self):
+        response, sql = self.get_page_query(
+            '/api/recipes/?limit=6&cursor=', **self.headers
+        )
+        self.assertUsesIndex(sql, 'recipes_created_idx')
+        response, sql = self.get_page_query(
+            response.data['next'], **self.headers
+        )
+        self.assertUsesIndex(sql, 'recipes_created_idx')
+        _, sql = self.get_page_query(
+            response.data['previous'], **self.headers
+        )
+        self.assertUsesIndex(sql, 'recipes_created_idx')
+
+    def test_author_page(self):
+        _, sql = self.get_page_query(
+            f'/api/recipes/?limit=6&author={self.author.id}', **self.headers
+        )
+        self.assertUsesIndex(sql, 'recipes_author_created_idx')
+
+    def test_author_cursor(self):
+        response, _ = self.get_page_query(
+            f'/api/recipes/?limit=2&cursor=&author={self.author.id}'
+        )
+        _, sql = self.get_page_query(response.data['next'])
+        self.assertUsesIndex(sql, 'recipes_author_created_idx')
+
+
+@skipUnless(
+    settings.REPLICA_DATABASE,
+    'Нужна реплика (DB_REPLICA_HOST); в тестах она зеркало default.',
+)
+class ReplicaRoutingTest(TransactionTestCase):
+    """Чтение API идёт с реплики, запись и чтение после неё — с основной.
+
+    В тестах реплика — зеркало основной БД (``TEST['MIRROR']``), но это
+    отдельное подключение, поэтому данные коммитятся, а маршрут запроса
+    виден по тому, через какое подключение он прошёл.
+    """
+
+    databases = '__all__'
+
+    def setUp(self):
+        self.user, _, _, _ = seed(users=3, recipes=10, ingredients=10)
+        self.recipe = Recipes.objects.exclude(
+            shopping_cart_items__user=self.user
+        ).first()
+        self.headers = auth_headers(self.user)
+
+    def request(self, method, url, **headers):
+        """Ответ и число SQL-запросов к реплике и к основной БД."""
+        with CaptureQueriesContext(
+            connections[settings.REPLICA_DATABASE]
+        ) as replica, CaptureQueriesContext(
+            connections[DEFAULT_DB_ALIAS]
+        ) as primary:
+            response = getattr(self.client, method)(url, **headers)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        return response, len(replica), len(primary)
+
+    def test_reads_go_to_replica(self):
+        response, replica, primary = self.request(
+            'get', '/api/recipes/', **self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(replica, 0)
+        self.assertEqual(primary, 0)
+
+    def test_streamed_body_reads_from_replica(self):
+        response, replica, primary = self.request(
+            'get', '/api/recipes/download_shopping_cart/?format=txt',
+            **self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertGreater(replica, 1)
+        self.assertEqual(primary, 0)
+
+    def test_write_makes_reads_sticky(self):
+        response, replica, _ = self.request(
+            'post', f'/api/recipes/{self.recipe.id}/shopping_cart/',
+            **self.headers
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(replica, 0)
+        self.assertIn('db_primary_until', response.cookies)
+
+        response, replica, primary = self.request(
+            'get', f'/api/recipes/{self.recipe.id}/', **self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(replica, 0)
+        self.assertGreater(primary, 0)
+
+        self.client.cookies.clear()
+        _, replica, primary = self.request(
+            'get', f'/api/recipes/{self.recipe.id}/', **self.headers
+        )
+        self.assertGreater(replica, 0)
+        self.assertEqual(primary, 0)
+
+    def test_failed_write_is_not_sticky(self):
+        response, _, _ = self.request(
+            'post', '/api/recipes/0/favorite/', **self.headers
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('db_primary_until', response.cookies)
+
+    def test_router(self):
+        replica = settings.REPLICA_DATABASE
+        self.assertEqual(router.db_for_read(Recipes), DEFAULT_DB_ALIAS)
+        token = read_from_replica.set(True)
+        try:
+            self.assertEqual(router.db_for_read(Recipes), replica)
+            self.assertEqual(router.db_for_write(Recipes), DEFAULT_DB_ALIAS)
+            with transaction.atomic():
+                self.assertEqual(
+                    router.db_for_read(Recipes), DEFAULT_DB_ALIAS
+                )
+        finally:
+            read_from_replica.reset(token)
+        self.assertFalse(router.allow_migrate(replica, 'recipes'))
+        self.assertTrue(router.allow_migrate(DEFAULT_DB_ALIAS, 'recipes'))
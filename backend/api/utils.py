@@ -1,39 +1,111 @@
+import hashlib
 from io import BytesIO
 
-from django.http import HttpResponse
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfgen import canvas
 
+from api.cache import LRUCache
 
-def generate_shopping_list(ingredients):
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = ('attachment;'
-                                       'filename="shopping_cart.pdf"')
+PDF_FONT_NAME = 'DejaVu'
+PDF_FONT_PATH = settings.BASE_DIR / 'static' / 'fonts' / 'DejaVuSans.ttf'
+PDF_FONT_SIZE = 12
+PDF_LEFT_MARGIN = 100
+PDF_TOP = 750
+PDF_BOTTOM_MARGIN = 50
+PDF_LINE_HEIGHT = 20
+
+shopping_lists_cache = LRUCache(
+    getattr(settings, 'SHOPPING_LIST_CACHE_SIZE', 256)
+)
+short_links_cache = LRUCache(
+    getattr(settings, 'SHORT_LINK_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'SHORT_LINK_CACHE_TTL', 300),
+)
+
+
+def register_fonts():
+    """Регистрирует шрифт для PDF при первой отрисовке в процессе."""
+    if PDF_FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont(PDF_FONT_NAME, PDF_FONT_PATH))
 
+
+def render_shopping_list_pdf(rows):
+    """Рисует список покупок, перенося строки на новые страницы."""
+    register_fonts()
     buffer = BytesIO()
     p = canvas.Canvas(buffer, pagesize=letter)
-    pdfmetrics.registerFont(TTFont('DejaVu', 'static/fonts/DejaVuSans.ttf'))
-    p.setFont('DejaVu', 12)
-    x = 100
-    y = 750
+    p.setFont(PDF_FONT_NAME, PDF_FONT_SIZE)
+    x = PDF_LEFT_MARGIN
+    y = PDF_TOP
 
     p.drawString(x, y, "Список покупок")
-    y -= 20
+    y -= PDF_LINE_HEIGHT
 
-    for ingredient, details in ingredients.items():
+    for row in rows:
+        if y < PDF_BOTTOM_MARGIN:
+            p.showPage()
+            p.setFont(PDF_FONT_NAME, PDF_FONT_SIZE)
+            y = PDF_TOP
         p.drawString(
-            x, y, f'{ingredient}'
-            f'({details["measurement_unit"]}):'
-            f'{details["total_amount"]}'
+            x, y, f'{row["name"]}'
+            f'({row["measurement_unit"]}):'
+            f'{row["total_amount"]}'
         )
-        y -= 20
+        y -= PDF_LINE_HEIGHT
 
     p.showPage()
     p.save()
     pdf = buffer.getvalue()
     buffer.close()
-    response.write(pdf)
+    return pdf
+
+
+def generate_shopping_list(content, content_type, filename):
+    """Файл списка покупок: байты целиком или итератор частей потоком."""
+    if isinstance(content, bytes):
+        response = HttpResponse(content, content_type=content_type)
+    else:
+        response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = ('attachment;'
+                                       f'filename="{filename}"')
+    return response
+
+
+def make_etag(*parts):
+    """Строгий ETag из значений, от которых зависит содержимое ответа."""
+    digest = hashlib.md5('|'.join(map(str, parts)).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def set_validators(response, etag, last_modified=None):
+    """Проставляет ETag/Last-Modified и требует ревалидации у клиента."""
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, no_cache=True)
+    patch_vary_headers(response, ('Authorization',))
+    return response
+
 
+def not_modified(request, etag, last_modified=None):
+    """Ответ 304, если копия клиента ещё актуальна, иначе None."""
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=(
+            int(last_modified.timestamp()) if last_modified else None
+        ),
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
     return response
@@ -1,19 +1,40 @@
-from django.db.models import Sum
+from django.db.models import (
+    BooleanField,
+    Exists,
+    F,
+    OuterRef,
+    Prefetch,
+    Sum,
+    Value,
+    Window,
+    prefetch_related_objects,
+)
+from django.db.models.functions import RowNumber
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
+from django.utils.cache import patch_cache_control
 from django_filters import rest_framework as filters
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import ValidationError
-from rest_framework.filters import SearchFilter
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
 
-from api.filters import IngredientsFilter, RecipesFilter
-from api.paginators import CustomPageLimitPagination
+from api.autocomplete import ingredients_index
+from api.filters import RecipesFilter
+from api.middleware import ServerTimingMixin
+from api.paginators import RecipesPagination
 from api.permissions import IsAuthorOrAdminOrReadOnly
+from api.reference import tags_reference
+from api.renderers import (
+    CSVShoppingListRenderer,
+    JSONShoppingListRenderer,
+    PDFShoppingListRenderer,
+    TextShoppingListRenderer,
+)
 from api.serializers import (
     ChangePasswordSerializer,
     IngredientsSerializer,
+    RecipeIdsSerializer,
     RecipesCreateUpdateSerializer,
     RecipesSerializer,
     ShortRecipesSerializer,
@@ -21,13 +42,28 @@ from api.serializers import (
     TagsSerializer,
     UserCreateSerializer,
     UserSerializer,
+    UserSerializerWithRecipes,
+)
+from api.utils import (
+    generate_shopping_list,
+    make_etag,
+    not_modified,
+    set_validators,
+    shopping_lists_cache,
+    short_links_cache,
+)
+from myprofile.models import (
+    Favorite,
+    MyProfile,
+    ShoppingCartItem,
+    Subscription,
 )
-from api.utils import generate_shopping_list
-from myprofile.models import MyProfile, Subscription
-from recipes.models import Ingredients, Recipes, Tags
+from recipes.models import Ingredients, RecipeIngredients, Recipes, Tags
+from recipes.short_links import decode_short_link
+from recipes.user_lists import add_recipes, remove_recipes
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ServerTimingMixin, viewsets.ModelViewSet):
     queryset = MyProfile.objects.all()
     serializer_class = UserSerializer
 
@@ -73,7 +109,7 @@ class UserViewSet(viewsets.ModelViewSet):
             if user.avatar:
                 user.avatar.delete(save=False)
                 user.avatar = None
-                user.save()
+                user.save(update_fields=('avatar',))
             return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -90,7 +126,7 @@ class UserViewSet(viewsets.ModelViewSet):
         if serializer.is_valid():
             new_password = serializer.validated_data['new_password']
             user.set_password(new_password)
-            user.save()
+            user.save(update_fields=('password',))
             return Response(
                 {'detail': 'Пароль успешно изменен.'},
                 status=status.HTTP_204_NO_CONTENT
@@ -105,13 +141,32 @@ class UserViewSet(viewsets.ModelViewSet):
     )
     def subscriptions(self, request):
         user = request.user
-        subscriptions = Subscription.objects.filter(subscriber=user)
-        paginator = self.pagination_class()
-        paginated_subscriptions = paginator.paginate_queryset(
-            subscriptions, request
+        recipes = Recipes.objects.annotate(
+            row_number=Window(
+                RowNumber(),
+                partition_by=F('author'),
+                order_by=F('created_at').desc(),
+            )
+        )
+        limit = request.GET.get('recipes_limit')
+        if limit and limit.isdigit():
+            recipes = recipes.filter(row_number__lte=int(limit))
+        authors = (
+            MyProfile.objects.filter(subscribers__subscriber=user)
+            .annotate(
+                is_author_subscribed=Value(True, output_field=BooleanField())
+            )
+            .prefetch_related(
+                Prefetch(
+                    'recipes', queryset=recipes, to_attr='recipes_preview'
+                )
+            )
+            .order_by('subscribers__id')
         )
-        serializer = SubscriptionSerializer(
-            paginated_subscriptions,
+        paginator = self.pagination_class()
+        paginated_authors = paginator.paginate_queryset(authors, request)
+        serializer = UserSerializerWithRecipes(
+            paginated_authors,
             many=True,
             context={'request': request})
         return paginator.get_paginated_response(serializer.data)
@@ -160,43 +215,88 @@ class UserViewSet(viewsets.ModelViewSet):
             )
 
 
-class TagsViewSet(viewsets.ReadOnlyModelViewSet):
+class TagsViewSet(ServerTimingMixin, viewsets.ReadOnlyModelViewSet):
     """Класс для работы с тегами рецептов."""
 
     queryset = Tags.objects.all()
     serializer_class = TagsSerializer
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        """Список тегов отдаётся из справочника в памяти процесса."""
+        return Response(tags_reference.all())
 
-class IngredientsViewSet(viewsets.ReadOnlyModelViewSet):
+
+class IngredientsViewSet(ServerTimingMixin, viewsets.ReadOnlyModelViewSet):
     """Класс для работы с ингредиентами рецептов."""
 
     queryset = Ingredients.objects.all()
     serializer_class = IngredientsSerializer
-    filter_backends = (filters.DjangoFilterBackend, SearchFilter,)
-    filterset_class = IngredientsFilter
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        """Автодополнение отдаётся из индекса в памяти процесса."""
+        name = request.query_params.get('name')
+        if name:
+            return Response(ingredients_index.search(name))
+        return Response(ingredients_index.all())
+
+
+RECIPES_PREFETCH = ('recipe_ingredients__ingredient', 'tags')
 
-class RecipesViewSet(viewsets.ModelViewSet):
+
+class RecipesViewSet(ServerTimingMixin, viewsets.ModelViewSet):
     """Для рецептов."""
 
     queryset = Recipes.objects.select_related(
-        'author').prefetch_related('ingredients', 'tags')
-    filter_backends = (filters.DjangoFilterBackend, SearchFilter)
+        'author').prefetch_related(*RECIPES_PREFETCH)
+    filter_backends = (filters.DjangoFilterBackend,)
     filterset_class = RecipesFilter
     serializer_class = RecipesSerializer
-    pagination_class = CustomPageLimitPagination
+    pagination_class = RecipesPagination
 
     def get_permissions(self):
+        if self.action == 'batch':
+            return super().get_permissions()
         if self.request.method == 'POST' or self.action in (
             'favorite', 'add_to_shopping_cart', 'download_shopping_cart',
+            'bulk_favorite', 'bulk_shopping_cart',
         ):
             return (permissions.IsAuthenticated(),)
         elif self.request.method in ['PATCH', 'DELETE']:
             return (IsAuthorOrAdminOrReadOnly(),)
         return super().get_permissions()
 
+    def get_queryset(self):
+        """Флаги избранного, корзины и подписки считаются в том же запросе."""
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            # Связанные объекты подгружаются только если не будет 304.
+            queryset = queryset.prefetch_related(None)
+        user = self.request.user
+        if not user.is_authenticated:
+            false = Value(False, output_field=BooleanField())
+            return queryset.annotate(
+                is_favorited=false,
+                is_in_shopping_cart=false,
+                is_author_subscribed=false,
+            )
+        return queryset.annotate(
+            is_favorited=Exists(
+                Favorite.objects.filter(user=user, recipe=OuterRef('pk'))
+            ),
+            is_in_shopping_cart=Exists(
+                ShoppingCartItem.objects.filter(
+                    user=user, recipe=OuterRef('pk')
+                )
+            ),
+            is_author_subscribed=Exists(
+                Subscription.objects.filter(
+                    subscriber=user, subscribe_to=OuterRef('author')
+                )
+            ),
+        )
+
     def get_serializer_class(self):
         if self.request.method in ['POST', 'PATCH']:
             return RecipesCreateUpdateSerializer
@@ -205,32 +305,121 @@ class RecipesViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    def list(self, request, *args, **kwargs):
+        """Список с ETag, собранным из рецептов выбранной страницы."""
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        etag = make_etag(
+            request.get_full_path(),
+            self._get_page_state(),
+            *(self._get_recipe_state(recipe) for recipe in page),
+        )
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+        prefetch_related_objects(page, *RECIPES_PREFETCH)
+        serializer = self.get_serializer(page, many=True)
+        return set_validators(
+            self.get_paginated_response(serializer.data), etag
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """Рецепт с ETag; анонимам также отдаётся Last-Modified."""
+        recipe = self.get_object()
+        etag = make_etag(*self._get_recipe_state(recipe))
+        last_modified = (
+            None if request.user.is_authenticated else recipe.updated_at
+        )
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        prefetch_related_objects([recipe], *RECIPES_PREFETCH)
+        return set_validators(
+            Response(self.get_serializer(recipe).data), etag, last_modified
+        )
+
+    @staticmethod
+    def _get_recipe_state(recipe):
+        """Всё, от чего зависит представление рецепта для пользователя."""
+        return (
+            recipe.pk,
+            recipe.updated_at.isoformat(),
+            recipe.is_favorited,
+            recipe.is_in_shopping_cart,
+            recipe.is_author_subscribed,
+        )
+
+    def _get_page_state(self):
+        if self.paginator.keyset:
+            return self.paginator.has_next, self.paginator.has_previous
+        return self.paginator.page.paginator.count
+
+    @action(detail=False, methods=('get', 'post'), url_path='batch')
+    def batch(self, request):
+        """Несколько рецептов за один запрос в порядке переданных id.
+
+        GET принимает ?ids=1,2,3, POST — тело {"ids": [...]}. Рецепты,
+        которых нет, в ответ не попадают.
+        """
+        if request.method == 'GET':
+            data = {'ids': [
+                item for item in request.query_params.get('ids', '').split(',')
+                if item
+            ]}
+        else:
+            data = request.data
+        serializer = RecipeIdsSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data['ids']))
+        recipes = self.get_queryset().filter(id__in=ids).in_bulk()
+        return Response(RecipesSerializer(
+            [recipes[pk] for pk in ids if pk in recipes],
+            many=True, context=self.get_serializer_context()
+        ).data)
+
     @action(detail=True, methods=['get'], url_path='get-link')
     def get_short_link(self, request, pk=None):
         """Получить короткую ссылку на рецепт."""
-        recipe = get_object_or_404(Recipes, id=pk)
-        short_link = request.build_absolute_uri(f'/s/{recipe.short_link}')
+        recipe = get_object_or_404(
+            Recipes.objects.only('id', 'short_link'), id=pk
+        )
+        short_link = request.build_absolute_uri(f'/s/{recipe.short_code}')
         return Response({'short-link': short_link})
 
     def _add_del_favorite_and_cart(
-        self, request, pk, related_name, add_error, delete_error
+        self, request, pk, list_model, add_error, delete_error
     ):
-        recipe = get_object_or_404(Recipes, id=pk)
+        if not str(pk).isdigit():
+            raise NotFound
+        pk = int(pk)
         user = request.user
-        related_model = getattr(user, related_name)
         if request.method == 'POST':
-            if related_model.filter(id=recipe.id).exists():
-                raise ValidationError(add_error)
-            related_model.add(recipe)
-            recipe.save()
-            return Response(ShortRecipesSerializer(
-                recipe).data, status=status.HTTP_201_CREATED)
-        if not related_model.filter(id=recipe.id).exists():
-            raise ValidationError(delete_error)
-
-        related_model.remove(recipe)
-        recipe.save()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+            if add_recipes(user, list_model, [pk]):
+                recipe = Recipes.objects.get(id=pk)
+                return Response(ShortRecipesSerializer(
+                    recipe).data, status=status.HTTP_201_CREATED)
+            get_object_or_404(Recipes.objects.only('id'), id=pk)
+            raise ValidationError(add_error)
+        if remove_recipes(user, list_model, [pk]):
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        get_object_or_404(Recipes.objects.only('id'), id=pk)
+        raise ValidationError(delete_error)
+
+    def _bulk_favorite_and_cart(self, request, list_model):
+        """Добавляет или удаляет сразу несколько рецептов.
+
+        В ответе перечислены только рецепты, для которых что-то изменилось.
+        """
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        if request.method == 'POST':
+            return Response({'added': add_recipes(
+                request.user, list_model, ids
+            )})
+        return Response({'removed': remove_recipes(
+            request.user, list_model, ids
+        )})
 
     @action(
         detail=True,
@@ -241,7 +430,7 @@ class RecipesViewSet(viewsets.ModelViewSet):
         return self._add_del_favorite_and_cart(
             request,
             pk,
-            'favorite_recipes',
+            Favorite,
             'Рецепт уже добавлен в избранное.',
             'Рецепт не найден в избранном.',
         )
@@ -255,42 +444,100 @@ class RecipesViewSet(viewsets.ModelViewSet):
         return self._add_del_favorite_and_cart(
             request,
             pk,
-            'shopping_cart_recipes',
+            ShoppingCartItem,
             'Рецепт уже добавлен в корзину.',
             'Рецепт не найден в корзине.',
         )
 
+    @action(
+        detail=False,
+        methods=('post', 'delete'),
+        url_path='favorite',
+    )
+    def bulk_favorite(self, request):
+        """Массово: POST/DELETE с телом {"ids": [...]}."""
+        return self._bulk_favorite_and_cart(request, Favorite)
+
+    @action(
+        detail=False,
+        methods=('post', 'delete'),
+        url_path='shopping_cart',
+    )
+    def bulk_shopping_cart(self, request):
+        """Массово: POST/DELETE с телом {"ids": [...]}."""
+        return self._bulk_favorite_and_cart(request, ShoppingCartItem)
+
     @action(
         detail=False,
         methods=('get',),
         url_path='download_shopping_cart',
+        renderer_classes=(
+            PDFShoppingListRenderer,
+            TextShoppingListRenderer,
+            CSVShoppingListRenderer,
+            JSONShoppingListRenderer,
+        ),
     )
     def download_shopping_cart(self, request):
-        """Для скачивания списка покупок."""
+        """Для скачивания списка покупок.
+
+        Формат выбирается через ?format=pdf|txt|csv|json или заголовок
+        Accept, по умолчанию PDF.
+        """
         user = request.user
-        recipes_ingredients = (
-            user.shopping_cart_recipes.prefetch_related(
-                'recipe_ingredients__ingredient'
+        renderer = request.accepted_renderer
+        cache_key = (user.id, user.shopping_cart_version, renderer.format)
+        etag = '"cart-{}-{}-{}"'.format(*cache_key)
+        response = not_modified(request, etag)
+        if response is not None:
+            patch_cache_control(response, private=True)
+            return response
+
+        rows = self._get_shopping_list_rows(user)
+        if renderer.cacheable:
+            content = shopping_lists_cache.get(cache_key)
+            if content is None:
+                content = renderer.render_content(rows)
+                shopping_lists_cache.set(cache_key, content)
+        else:
+            content = renderer.stream(rows.iterator())
+        response = generate_shopping_list(
+            content, renderer.content_type, renderer.attachment_name
+        )
+        set_validators(response, etag)
+        patch_cache_control(response, private=True)
+        return response
+
+    @staticmethod
+    def _get_shopping_list_rows(user):
+        return (
+            RecipeIngredients.objects.filter(
+                recipe__shopping_cart_items__user=user
             )
             .values(
-                'recipe_ingredients__ingredient__name',
-                'recipe_ingredients__ingredient__measurement_unit',
+                name=F('ingredient__name'),
+                measurement_unit=F('ingredient__measurement_unit'),
             )
-            .annotate(total_amount=Sum('recipe_ingredients__amount'))
+            .annotate(total_amount=Sum('amount'))
+            .order_by('name', 'measurement_unit')
         )
-        ingredients = {
-            item['recipe_ingredients__ingredient__name']: {
-                'measurement_unit':
-                item['recipe_ingredients__ingredient__measurement_unit'],
-                'total_amount': item['total_amount']
-            }
-            for item in recipes_ingredients
-        }
-        return generate_shopping_list(ingredients)
 
 
 def redirect_short_link(request, short_link):
-    """Перенаправление по короткой ссылке на рецепт."""
-    recipe = get_object_or_404(Recipes, short_link=short_link)
-    reverse_url = reverse('recipes', kwargs={'pk': recipe.id})
+    """Перенаправление по короткой ссылке на рецепт.
+
+    Новые коды декодируются в id с проверкой контрольных бит, старые
+    случайные коды ищутся по полю short_link. Существование рецепта
+    проверяется в БД один раз, дальше id берётся из LRU-кэша процесса.
+    """
+    recipe_id = short_links_cache.get(short_link)
+    if recipe_id is None:
+        decoded = decode_short_link(short_link)
+        recipes = Recipes.objects.values_list('id', flat=True)
+        if decoded is not None:
+            recipe_id = get_object_or_404(recipes, id=decoded)
+        else:
+            recipe_id = get_object_or_404(recipes, short_link=short_link)
+        short_links_cache.set(short_link, recipe_id)
+    reverse_url = reverse('recipes', kwargs={'pk': recipe_id})
     return redirect(reverse_url)
@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from jobs.models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id', 'task', 'status', 'attempts', 'run_at', 'finished_at'
+    )
+    list_filter = ('status', 'task')
+    search_fields = ('task', 'last_error')
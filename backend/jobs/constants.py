@@ -0,0 +1,6 @@
+MAX_LENGTH_TASK_NAME = 128
+MAX_LENGTH_STATUS = 16
+DEFAULT_MAX_ATTEMPTS = 5
+RETRY_BACKOFF_SECONDS = 10
+MAX_RETRY_DELAY_SECONDS = 3600
+STALE_JOB_TIMEOUT_SECONDS = 1800
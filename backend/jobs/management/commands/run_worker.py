@@ -0,0 +1,68 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from jobs.queue import claim_job, run_job
+
+
+class Command(BaseCommand):
+    """Воркер фоновой очереди задач."""
+
+    help = 'Выполняет задачи из очереди jobs в несколько потоков'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=1,
+            help='Количество потоков-обработчиков.'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Завершиться, когда в очереди не останется задач.'
+        )
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        signal.signal(signal.SIGTERM, self.shutdown)
+        signal.signal(signal.SIGINT, self.shutdown)
+        threads = [
+            threading.Thread(
+                target=self.work,
+                args=(options['poll_interval'], options['burst']),
+                name=f'jobs-worker-{number}',
+            )
+            for number in range(options['concurrency'])
+        ]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Воркер запущен, потоков: {options["concurrency"]}.'
+            )
+        )
+        for thread in threads:
+            thread.join()
+        self.stdout.write(self.style.SUCCESS('Воркер остановлен.'))
+
+    def shutdown(self, signum, frame):
+        self.stop.set()
+
+    def work(self, poll_interval, burst):
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                job = claim_job()
+                if job is None:
+                    if burst:
+                        return
+                    self.stop.wait(poll_interval)
+                    continue
+                status = run_job(job)
+                self.stdout.write(f'{job.task} #{job.pk}: {status}')
+        finally:
+            connection.close()
@@ -0,0 +1,129 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from jobs.constants import (
+    MAX_RETRY_DELAY_SECONDS,
+    RETRY_BACKOFF_SECONDS,
+    STALE_JOB_TIMEOUT_SECONDS,
+)
+from jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+def task(func=None, *, name=None):
+    """Регистрирует функцию как фоновую задачу.
+
+    Задачи ищутся в модулях ``tasks.py`` приложений. Аргументы задачи
+    передаются именованными и должны сериализоваться в JSON.
+    """
+    def decorator(func):
+        func.task_name = name or f'{func.__module__}.{func.__name__}'
+        registry[func.task_name] = func
+        return func
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def enqueue(func, *, delay=None, max_attempts=None, unique=False,
+            **kwargs):
+    """Ставит задачу в очередь и возвращает созданный Job.
+
+    Запись создаётся в текущей транзакции, поэтому воркер увидит задачу
+    только после её коммита. При ``JOBS_EAGER = True`` задача выполняется
+    сразу, в текущем процессе. С ``unique=True`` новая задача не
+    создаётся, если такая же (та же задача и аргументы) ещё ждёт в
+    очереди: возвращается уже поставленная.
+    """
+    if getattr(settings, 'JOBS_EAGER', False):
+        func(**kwargs)
+        return None
+    if unique:
+        job = Job.objects.filter(
+            status=Job.QUEUED, task=func.task_name, kwargs=kwargs
+        ).first()
+        if job is not None:
+            return job
+    job = Job(task=func.task_name, kwargs=kwargs)
+    if delay is not None:
+        job.run_at = timezone.now() + delay
+    if max_attempts is not None:
+        job.max_attempts = max_attempts
+    job.save()
+    return job
+
+
+def claim_job():
+    """Забирает одну готовую к запуску задачу.
+
+    ``SELECT ... FOR UPDATE SKIP LOCKED`` позволяет нескольким воркерам
+    разбирать очередь параллельно, не блокируя друг друга. Задачи,
+    зависшие в статусе running дольше таймаута, забираются повторно.
+    """
+    now = timezone.now()
+    stale_before = now - timedelta(
+        seconds=getattr(
+            settings, 'JOBS_STALE_TIMEOUT', STALE_JOB_TIMEOUT_SECONDS
+        )
+    )
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=Job.QUEUED, run_at__lte=now)
+                | Q(status=Job.RUNNING, locked_at__lt=stale_before)
+            )
+            .order_by('run_at', 'id')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = Job.RUNNING
+        job.locked_at = now
+        job.attempts += 1
+        job.save(update_fields=('status', 'locked_at', 'attempts'))
+    return job
+
+
+def retry_delay(attempts):
+    backoff = getattr(settings, 'JOBS_RETRY_BACKOFF', RETRY_BACKOFF_SECONDS)
+    return timedelta(
+        seconds=min(backoff * 2 ** (attempts - 1), MAX_RETRY_DELAY_SECONDS)
+    )
+
+
+def run_job(job):
+    """Выполняет задачу и записывает результат или планирует повтор."""
+    func = registry.get(job.task)
+    try:
+        if func is None:
+            raise LookupError(f'Задача {job.task} не зарегистрирована.')
+        func(**job.kwargs)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = Job.FAILED
+            job.finished_at = timezone.now()
+            logger.exception('Задача %s окончательно не выполнена', job)
+        else:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + retry_delay(job.attempts)
+            logger.warning('Задача %s будет повторена', job, exc_info=True)
+    else:
+        job.status = Job.DONE
+        job.finished_at = timezone.now()
+    job.locked_at = None
+    job.save(update_fields=(
+        'status', 'run_at', 'locked_at', 'last_error', 'finished_at'
+    ))
+    return job.status
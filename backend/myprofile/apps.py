@@ -5,3 +5,6 @@ class MyprofileConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'myprofile'
     verbose_name = 'Профиль и подписки'
+
+    def ready(self):
+        import myprofile.signals  # noqa: F401
@@ -2,3 +2,4 @@ MAX_LENGTH_FIRST_NAME = 150
 MAX_LENGTH_LAST_NAME = 150
 MAX_LENGTH_USERNAME = 150
 MAX_LENGTH_EMAIL = 254
+AVATAR_SIZES = {'thumbnail': 96, 'card': 256}
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.19 on 2026-10-18 01:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myprofile', '0008_myprofile_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='myprofile',
+            name='shopping_cart_version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Версия списка покупок'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.19 on 2026-10-18 01:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myprofile', '0009_myprofile_shopping_cart_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='myprofile',
+            name='avatar_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Уменьшенные копии аватара'),
+        ),
+    ]
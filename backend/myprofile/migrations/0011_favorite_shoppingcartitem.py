@@ -0,0 +1,99 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+COPY_ROWS_SQL = '''
+INSERT INTO myprofile_favorite (user_id, recipe_id, created_at)
+SELECT myprofile_id, recipes_id, now()
+FROM myprofile_myprofile_favorite_recipes;
+
+INSERT INTO myprofile_shoppingcartitem (user_id, recipe_id, created_at)
+SELECT myprofile_id, recipes_id, now()
+FROM myprofile_myprofile_shopping_cart_recipes;
+'''
+
+COPY_ROWS_BACK_SQL = '''
+INSERT INTO myprofile_myprofile_favorite_recipes (myprofile_id, recipes_id)
+SELECT user_id, recipe_id FROM myprofile_favorite;
+
+INSERT INTO myprofile_myprofile_shopping_cart_recipes (
+    myprofile_id, recipes_id
+)
+SELECT user_id, recipe_id FROM myprofile_shoppingcartitem;
+'''
+
+
+def user_recipe_fields():
+    return [
+        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+        ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата добавления')),
+        ('recipe', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='recipes.recipes', verbose_name='Рецепт')),
+        ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+    ]
+
+
+class Migration(migrations.Migration):
+    """Явные модели связи для избранного и списка покупок.
+
+    Существующие строки копируются из автоматических таблиц связи, после
+    чего старые поля ManyToMany заменяются полями с through.
+    """
+
+    dependencies = [
+        ('recipes', '0014_recipes_tags_tag_recipe_index'),
+        ('myprofile', '0010_myprofile_avatar_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Favorite',
+            fields=user_recipe_fields(),
+            options={
+                'verbose_name': 'Избранный рецепт',
+                'verbose_name_plural': 'Избранные рецепты',
+                'default_related_name': 'favorites',
+                'indexes': [
+                    models.Index(fields=['recipe'], name='favorite_recipe_idx'),
+                    models.Index(fields=['user', '-created_at'], name='favorite_user_created_idx'),
+                ],
+                'constraints': [
+                    models.UniqueConstraint(fields=('user', 'recipe'), name='unique_favorite'),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='ShoppingCartItem',
+            fields=user_recipe_fields(),
+            options={
+                'verbose_name': 'Рецепт в списке покупок',
+                'verbose_name_plural': 'Рецепты в списке покупок',
+                'default_related_name': 'shopping_cart_items',
+                'indexes': [
+                    models.Index(fields=['recipe'], name='shopping_cart_recipe_idx'),
+                    models.Index(fields=['user', '-created_at'], name='shopping_cart_user_created_idx'),
+                ],
+                'constraints': [
+                    models.UniqueConstraint(fields=('user', 'recipe'), name='unique_shopping_cart_item'),
+                ],
+            },
+        ),
+        migrations.RunSQL(COPY_ROWS_SQL, COPY_ROWS_BACK_SQL),
+        migrations.RemoveField(
+            model_name='myprofile',
+            name='favorite_recipes',
+        ),
+        migrations.RemoveField(
+            model_name='myprofile',
+            name='shopping_cart_recipes',
+        ),
+        migrations.AddField(
+            model_name='myprofile',
+            name='favorite_recipes',
+            field=models.ManyToManyField(blank=True, related_name='favorited_by', through='myprofile.Favorite', to='recipes.recipes'),
+        ),
+        migrations.AddField(
+            model_name='myprofile',
+            name='shopping_cart_recipes',
+            field=models.ManyToManyField(blank=True, related_name='in_shopping_cart', through='myprofile.ShoppingCartItem', to='recipes.recipes'),
+        ),
+    ]
@@ -12,6 +12,7 @@ from myprofile.constants import (
     MAX_LENGTH_LAST_NAME,
     MAX_LENGTH_USERNAME,
 )
+from recipes.mixins import ProtectedFieldsMixin
 
 
 class MyProfileManager(BaseUserManager):
@@ -66,7 +67,7 @@ class MyProfileManager(BaseUserManager):
         )
 
 
-class MyProfile(AbstractBaseUser, PermissionsMixin):
+class MyProfile(ProtectedFieldsMixin, AbstractBaseUser, PermissionsMixin):
     """Кастомная модель юзера."""
     first_name = models.CharField(
         max_length=MAX_LENGTH_FIRST_NAME,
@@ -95,23 +96,51 @@ class MyProfile(AbstractBaseUser, PermissionsMixin):
         null=True,
         default=''
     )
+    avatar_renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии аватара'
+    )
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     is_subscribed = models.BooleanField(default=False)
     favorite_recipes = models.ManyToManyField(
         'recipes.Recipes',
+        through='Favorite',
         related_name='favorited_by',
         blank=True
     )
     shopping_cart_recipes = models.ManyToManyField(
         'recipes.Recipes',
+        through='ShoppingCartItem',
         related_name='in_shopping_cart',
         blank=True
     )
     date_joined = models.DateTimeField(default=timezone.now)
+    recipes_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество рецептов'
+    )
+    subscriptions_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество подписчиков'
+    )
+    shopping_cart_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия списка покупок'
+    )
 
     objects = MyProfileManager()
 
+    protected_fields = (
+        'recipes_count', 'subscriptions_count', 'shopping_cart_version',
+        'avatar_renditions',
+    )
+
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
 
@@ -122,14 +151,6 @@ class MyProfile(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.username
 
-    @property
-    def subscriptions_count(self):
-        return self.subscribers.count()
-
-    @property
-    def recipes_count(self):
-        return self.recipes.count()
-
 
 class Subscription(models.Model):
     subscriber = models.ForeignKey(
@@ -163,3 +184,76 @@ class Subscription(models.Model):
             f'{self.subscriber.username} подписался на'
             f'{self.subscribe_to.username}'
         )
+
+
+class UserRecipe(models.Model):
+    """Рецепт в личном списке пользователя с датой добавления.
+
+    Уникальное ограничение (user, recipe) служит и индексом для поиска по
+    пользователю, отдельные индексы — по рецепту и по последним
+    добавлениям пользователя.
+    """
+    user = models.ForeignKey(
+        MyProfile,
+        on_delete=models.CASCADE,
+        db_index=False,
+        verbose_name='Пользователь'
+    )
+    recipe = models.ForeignKey(
+        'recipes.Recipes',
+        on_delete=models.CASCADE,
+        db_index=False,
+        verbose_name='Рецепт'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата добавления'
+    )
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f'{self.user} — {self.recipe}'
+
+
+class Favorite(UserRecipe):
+
+    class Meta:
+        default_related_name = 'favorites'
+        verbose_name = 'Избранный рецепт'
+        verbose_name_plural = 'Избранные рецепты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'recipe'), name='unique_favorite'
+            )
+        ]
+        indexes = [
+            models.Index(fields=('recipe',), name='favorite_recipe_idx'),
+            models.Index(
+                fields=('user', '-created_at'),
+                name='favorite_user_created_idx'
+            ),
+        ]
+
+
+class ShoppingCartItem(UserRecipe):
+
+    class Meta:
+        default_related_name = 'shopping_cart_items'
+        verbose_name = 'Рецепт в списке покупок'
+        verbose_name_plural = 'Рецепты в списке покупок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'recipe'), name='unique_shopping_cart_item'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=('recipe',), name='shopping_cart_recipe_idx'
+            ),
+            models.Index(
+                fields=('user', '-created_at'),
+                name='shopping_cart_user_created_idx'
+            ),
+        ]
@@ -0,0 +1,44 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from jobs.queue import enqueue
+from myprofile.models import MyProfile, Subscription
+from recipes.counters import change_counter
+from recipes.images import renditions_outdated
+from recipes.tasks import delete_image_renditions, refresh_image_renditions
+
+
+@receiver(post_save, sender=Subscription)
+def increment_subscriptions_count(sender, instance, created, **kwargs):
+    if created:
+        change_counter(
+            MyProfile.objects.filter(pk=instance.subscribe_to_id),
+            'subscriptions_count', 1
+        )
+
+
+@receiver(post_delete, sender=Subscription)
+def decrement_subscriptions_count(sender, instance, **kwargs):
+    change_counter(
+        MyProfile.objects.filter(pk=instance.subscribe_to_id),
+        'subscriptions_count', -1
+    )
+
+
+@receiver(post_save, sender=MyProfile)
+def update_avatar_renditions(sender, instance, update_fields, **kwargs):
+    if update_fields is not None and 'avatar' not in update_fields:
+        return
+    if renditions_outdated(instance, 'avatar', 'avatar_renditions'):
+        enqueue(
+            refresh_image_renditions, unique=True,
+            model='myprofile.myprofile', pk=instance.pk
+        )
+
+
+@receiver(post_delete, sender=MyProfile)
+def delete_avatar_renditions(sender, instance, **kwargs):
+    if instance.avatar_renditions:
+        enqueue(
+            delete_image_renditions, renditions=instance.avatar_renditions
+        )
@@ -37,10 +37,6 @@ class RecipesAdmin(admin.ModelAdmin):
     search_fields = ('name', 'author__username',)
     list_filter = ('tags', 'author__username')
 
-    @admin.display(description='Количество добавлений в избранное')
-    def favorited_count(self, obj):
-        return obj.favorited_by.count()
-
     @admin.display(description='Теги')
     def tags_list(self, obj):
         return ", ".join([tag.name for tag in obj.tags.all()])
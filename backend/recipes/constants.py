@@ -9,3 +9,11 @@ MIN_COOKING_TIME = 1
 MAX_COOKING_TIME = 10000
 MIN_AMOUNT = 1
 MAX_AMOUNT = 10000
+SEARCH_CONFIGS = ('russian', 'english')
+SHORT_LINK_LENGTH = 7
+SHORT_LINK_BITS = 40
+SHORT_LINK_ID_BITS = 31
+RECIPE_IMAGE_SIZES = {'thumbnail': 320, 'card': 800}
+IMAGE_RENDITION_FORMATS = ('webp', 'jpeg')
+IMAGE_RENDITION_QUALITY = 80
+BULK_RECIPES_LIMIT = 100
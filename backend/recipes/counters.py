@@ -0,0 +1,54 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+
+def change_counter(queryset, field, delta):
+    """Атомарно изменяет счётчик через F(), не опуская его ниже нуля."""
+    if delta >= 0:
+        return queryset.update(**{field: F(field) + delta})
+    return queryset.update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def bump_shopping_cart_version(users):
+    """Сбрасывает кэш и ETag списка покупок у переданных пользователей."""
+    return change_counter(users, 'shopping_cart_version', 1)
+
+
+def touch_recipes(recipes):
+    """Сдвигает updated_at рецептов, чтобы сменились их ETag.
+
+    Нужно, когда меняются данные, которые выводятся внутри рецепта:
+    автор, теги или ингредиенты.
+    """
+    return recipes.update(updated_at=timezone.now())
+
+
+def count_subquery(queryset, field):
+    """Подзапрос с количеством строк queryset для каждого OuterRef('pk')."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0
+    )
+
+
+def rebuild_counters():
+    """Пересчитывает все денормализованные счётчики одним UPDATE на поле."""
+    from myprofile.models import Favorite, MyProfile, Subscription
+    from recipes.models import Recipes
+
+    Recipes.objects.update(
+        favorited_count=count_subquery(Favorite.objects.all(), 'recipe')
+    )
+    MyProfile.objects.update(
+        recipes_count=count_subquery(Recipes.objects.all(), 'author'),
+        subscriptions_count=count_subquery(
+            Subscription.objects.all(), 'subscribe_to'
+        ),
+    )
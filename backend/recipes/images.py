@@ -0,0 +1,92 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from recipes.constants import IMAGE_RENDITION_FORMATS, IMAGE_RENDITION_QUALITY
+
+PIL_FORMATS = {'webp': 'WEBP', 'jpeg': 'JPEG'}
+
+
+def build_renditions(field_file, sizes, formats=IMAGE_RENDITION_FORMATS):
+    """Создаёт уменьшенные копии изображения во всех форматах.
+
+    Возвращает словарь вида
+    ``{'source': имя_оригинала, 'thumbnail': {'width': 320,
+    'webp': путь, 'jpeg': путь}, ...}``. Оригинал не увеличивается:
+    если он уже уже нужной ширины, копия сохраняется в его размере.
+    """
+    field_file.open('rb')
+    try:
+        with Image.open(field_file) as image:
+            image = ImageOps.exif_transpose(image).convert('RGB')
+    finally:
+        field_file.close()
+
+    directory, filename = os.path.split(field_file.name)
+    stem = os.path.splitext(filename)[0]
+    renditions = {'source': field_file.name}
+    for label, width in sizes.items():
+        resized = image.copy()
+        if resized.width > width:
+            height = round(resized.height * width / resized.width)
+            resized = resized.resize((width, height), Image.LANCZOS)
+        rendition = {'width': resized.width}
+        for image_format in formats:
+            buffer = BytesIO()
+            resized.save(
+                buffer, PIL_FORMATS[image_format],
+                quality=IMAGE_RENDITION_QUALITY, optimize=True
+            )
+            rendition[image_format] = default_storage.save(
+                os.path.join(
+                    directory, 'renditions',
+                    f'{stem}_{label}.{image_format}'
+                ),
+                ContentFile(buffer.getvalue())
+            )
+        renditions[label] = rendition
+    return renditions
+
+
+def delete_renditions(renditions):
+    for label, rendition in renditions.items():
+        if label == 'source':
+            continue
+        for image_format in IMAGE_RENDITION_FORMATS:
+            if rendition.get(image_format):
+                default_storage.delete(rendition[image_format])
+
+
+def renditions_outdated(instance, image_field, renditions_field):
+    field_file = getattr(instance, image_field)
+    renditions = getattr(instance, renditions_field) or {}
+    source = field_file.name if field_file else None
+    return renditions.get('source') != source
+
+
+def refresh_renditions(queryset, instance, image_field, renditions_field,
+                       sizes):
+    """Пересобирает копии, если оригинал изображения сменился.
+
+    Поля с ``auto_now`` обновляются вместе с копиями, чтобы сменились
+    валидаторы кэша (ETag, Last-Modified) у объекта. Возвращает True,
+    если копии были пересобраны.
+    """
+    if not renditions_outdated(instance, image_field, renditions_field):
+        return False
+    field_file = getattr(instance, image_field)
+    renditions = getattr(instance, renditions_field) or {}
+    source = field_file.name if field_file else None
+    delete_renditions(renditions)
+    renditions = build_renditions(field_file, sizes) if source else {}
+    changes = {renditions_field: renditions}
+    for field in instance._meta.concrete_fields:
+        if getattr(field, 'auto_now', False):
+            changes[field.attname] = timezone.now()
+    queryset.filter(pk=instance.pk).update(**changes)
+    setattr(instance, renditions_field, renditions)
+    return True
@@ -0,0 +1,36 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from recipes.images import refresh_renditions
+from recipes.tasks import RENDITION_TARGETS
+
+
+class Command(BaseCommand):
+    """Команда для создания уменьшенных копий уже загруженных картинок."""
+
+    help = 'Создаёт уменьшенные копии изображений рецептов и аватаров'
+
+    def handle(self, *args, **options):
+        for label, target in RENDITION_TARGETS.items():
+            image_field, renditions_field, sizes = target
+            model = apps.get_model(label)
+            queryset = model.objects.exclude(
+                **{f'{image_field}__in': ('', None)}
+            ).only('pk', image_field, renditions_field)
+            for instance in queryset.iterator():
+                try:
+                    refresh_renditions(
+                        model.objects, instance,
+                        image_field, renditions_field, sizes
+                    )
+                except (OSError, ValueError) as error:
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f'{model.__name__} {instance.pk}: {error}'
+                        )
+                    )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Копии для {model._meta.verbose_name_plural} готовы.'
+                )
+            )
@@ -0,0 +1,86 @@
+import base64
+import json
+import mimetypes
+
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipes
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+class Command(BaseCommand):
+    """Команда для выгрузки рецептов в NDJSON.
+
+    Каждая строка файла — один рецепт с автором, тегами и ингредиентами.
+    Рецепты читаются через ``iterator(chunk_size=...)``, поэтому память не
+    растёт с размером базы.
+    """
+
+    help = 'Выгрузка рецептов с ингредиентами и тегами в NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default='-',
+            help='Файл для записи; по умолчанию stdout.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Сколько рецептов читать из БД за один запрос.'
+        )
+        parser.add_argument(
+            '--embed-images', action='store_true',
+            help='Встроить картинки в base64 вместо путей в media.'
+        )
+
+    def handle(self, *args, **options):
+        recipes = (
+            Recipes.objects.select_related('author')
+            .prefetch_related('tags', 'recipe_ingredients__ingredient')
+            .order_by('id')
+            .iterator(chunk_size=options['chunk_size'])
+        )
+        output = (
+            self.stdout if options['output'] == '-'
+            else open(options['output'], 'w', encoding='utf-8')
+        )
+        exported = 0
+        try:
+            for recipe in recipes:
+                record = self.serialize(recipe, options['embed_images'])
+                output.write(json.dumps(record, ensure_ascii=False) + '\n')
+                exported += 1
+        finally:
+            if output is not self.stdout:
+                output.close()
+        self.stderr.write(
+            self.style.SUCCESS(f'Выгружено рецептов: {exported}.')
+        )
+
+    def serialize(self, recipe, embed_images):
+        return {
+            'name': recipe.name,
+            'text': recipe.text,
+            'cooking_time': recipe.cooking_time,
+            'created_at': recipe.created_at.isoformat(),
+            'author': recipe.author.username,
+            'image': self.serialize_image(recipe.image, embed_images),
+            'tags': [tag.slug for tag in recipe.tags.all()],
+            'ingredients': [
+                {
+                    'name': item.ingredient.name,
+                    'measurement_unit': item.ingredient.measurement_unit,
+                    'amount': item.amount,
+                }
+                for item in recipe.recipe_ingredients.all()
+            ],
+        }
+
+    @staticmethod
+    def serialize_image(image, embed_images):
+        if not image or not embed_images:
+            return image.name or None
+        content_type = mimetypes.guess_type(image.name)[0] or 'image/png'
+        with image.open('rb') as image_file:
+            encoded = base64.b64encode(image_file.read()).decode()
+        return f'data:{content_type};base64,{encoded}'
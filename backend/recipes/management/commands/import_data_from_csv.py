@@ -1,55 +1,182 @@
 import csv
+import json
 import os
+from io import StringIO
 
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from django.db.utils import IntegrityError
+from django.db import connection, transaction
 
+from api.autocomplete import ingredients_index
+from recipes.constants import MAX_LENGTH_MEAS_UNIT, MAX_LENGTH_NAME_INGR
 from recipes.models import Ingredients
+from recipes.utils import batched
 
-MODEL_FILES = {
-    Ingredients: 'ingredients.csv',
-}
+DEFAULT_PATH = os.path.join(
+    settings.BASE_DIR, 'static', 'data', 'ingredients.csv'
+)
+DEFAULT_BATCH_SIZE = 5000
 
 
 class Command(BaseCommand):
-    """Команда для импорта данных в БД."""
+    """Команда для импорта ингредиентов в БД.
 
-    help = 'Импорт данных из CSV-файлов в базу данных'
+    Строки загружаются пачками: через ``bulk_create(ignore_conflicts=True)``
+    или, с флагом ``--copy`` на PostgreSQL, через ``COPY`` во временную
+    таблицу и один ``INSERT ... ON CONFLICT DO NOTHING``. Повторный запуск
+    на тех же данных ничего не меняет.
+    """
+
+    help = 'Импорт ингредиентов из CSV- или JSON-файла в базу данных'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=DEFAULT_PATH,
+            help='Путь к файлу с ингредиентами (CSV или JSON).'
+        )
+        parser.add_argument(
+            '--format', choices=('csv', 'json'),
+            help='Формат файла; по умолчанию определяется по расширению.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одной пачке.'
+        )
+        parser.add_argument(
+            '--copy', action='store_true',
+            help='Загрузить через COPY и staging-таблицу (PostgreSQL).'
+        )
 
     def handle(self, *args, **options):
-        for model, file_name in MODEL_FILES.items():
-            file_path = os.path.join('static/data', file_name)
-            try:
-                with open(file_path, 'r', encoding='utf-8') as csv_file:
-                    reader = csv.reader(csv_file)
-                    for row in reader:
-                        name, measurement_unit = row
-                        try:
-                            model.objects.create(
-                                name=name, measurement_unit=measurement_unit
-                            )
-                        except IntegrityError:
-                            self.stdout.write(
-                                self.style.WARNING(
-                                    f"Ингредиент '{name}' уже существует."
-                                )
-                            )
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f'Данные из файла {file_name} успешно загружены в БД.'
+        file_path = options['path']
+        file_format = options['format'] or (
+            'json' if file_path.lower().endswith('.json') else 'csv'
+        )
+        self.skipped = 0
+        try:
+            with open(file_path, 'r', encoding='utf-8') as data_file:
+                rows = self.read_rows(data_file, file_format)
+                if options['copy'] and connection.vendor == 'postgresql':
+                    processed, created = self.copy_rows(
+                        rows, options['batch_size']
                     )
-                )
-            except FileNotFoundError:
-                self.stdout.write(
-                    self.style.ERROR(
-                        f'Файл {file_name} не найден в директории '
-                        f'static/data'
+                else:
+                    processed, created = self.bulk_create_rows(
+                        rows, options['batch_size']
                     )
+        except FileNotFoundError:
+            self.stdout.write(
+                self.style.ERROR(f'Файл {file_path} не найден.')
+            )
+            return
+        except (ValueError, csv.Error) as e:
+            self.stdout.write(
+                self.style.ERROR(
+                    f'Произошла ошибка при обработке файла {file_path}: '
+                    f'{str(e)}'
+                )
+            )
+            return
+
+        if created:
+            ingredients_index.invalidate()
+        if self.skipped:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'Пропущено некорректных строк: {self.skipped}.'
                 )
-            except Exception as e:
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Данные из файла {file_path} загружены в БД: '
+                f'обработано {processed}, добавлено {created}, '
+                f'уже существовало {processed - created}.'
+            )
+        )
+
+    def read_rows(self, data_file, file_format):
+        """Пары (название, единица); номер записи в JSON или строки в CSV."""
+        if file_format == 'json':
+            records = enumerate(
+                (
+                    (item.get('name'), item.get('measurement_unit'))
+                    if isinstance(item, dict) else (item,)
+                    for item in json.load(data_file)
+                ),
+                start=1,
+            )
+        else:
+            reader = csv.reader(data_file)
+            records = ((reader.line_num, tuple(row)) for row in reader)
+        for number, record in records:
+            row = self.clean_record(record)
+            if row is None:
+                self.skipped += 1
                 self.stdout.write(
-                    self.style.ERROR(
-                        f'Произошла ошибка при обработке файла {file_name}: '
-                        f'{str(e)}'
+                    self.style.WARNING(
+                        f'Запись {number} пропущена: {record!r}'
                     )
                 )
+                continue
+            yield row
+
+    @staticmethod
+    def clean_record(record):
+        if len(record) != 2 or not all(
+            isinstance(value, str) for value in record
+        ):
+            return None
+        name, measurement_unit = record[0].strip(), record[1].strip()
+        if (
+            not name
+            or not measurement_unit
+            or len(name) > MAX_LENGTH_NAME_INGR
+            or len(measurement_unit) > MAX_LENGTH_MEAS_UNIT
+        ):
+            return None
+        return name, measurement_unit
+
+    def report_progress(self, processed):
+        self.stdout.write(f'Обработано строк: {processed}')
+
+    def bulk_create_rows(self, rows, batch_size):
+        before = Ingredients.objects.count()
+        processed = 0
+        for batch in batched(rows, batch_size):
+            Ingredients.objects.bulk_create(
+                [
+                    Ingredients(name=name, measurement_unit=measurement_unit)
+                    for name, measurement_unit in batch
+                ],
+                ignore_conflicts=True,
+            )
+            processed += len(batch)
+            self.report_progress(processed)
+        return processed, Ingredients.objects.count() - before
+
+    def copy_rows(self, rows, batch_size):
+        table = Ingredients._meta.db_table
+        processed = 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TEMPORARY TABLE ingredients_staging '
+                '(name text, measurement_unit text) ON COMMIT DROP'
+            )
+            for batch in batched(rows, batch_size):
+                buffer = StringIO()
+                csv.writer(buffer).writerows(batch)
+                buffer.seek(0)
+                cursor.copy_expert(
+                    'COPY ingredients_staging FROM STDIN WITH (FORMAT csv)',
+                    buffer
+                )
+                processed += len(batch)
+                self.report_progress(processed)
+            cursor.execute(
+                f'INSERT INTO {table} (name, measurement_unit) '
+                'SELECT DISTINCT name, measurement_unit '
+                'FROM ingredients_staging '
+                'ON CONFLICT (name, measurement_unit) DO NOTHING'
+            )
+            created = cursor.rowcount
+        return processed, created
@@ -0,0 +1,205 @@
+import base64
+import binascii
+import json
+import sys
+import uuid
+from contextlib import contextmanager
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from myprofile.models import MyProfile
+from recipes.counters import rebuild_counters
+from recipes.models import Ingredients, RecipeIngredients, Recipes, Tags
+from recipes.utils import batched
+
+DEFAULT_BATCH_SIZE = 500
+IMAGE_UPLOAD_TO = Recipes._meta.get_field('image').upload_to
+
+
+@contextmanager
+def explicit_created_at():
+    """Даёт bulk_create сохранить created_at из файла вместо текущего."""
+    field = Recipes._meta.get_field('created_at')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    """Команда для загрузки рецептов из NDJSON, выгруженного export_recipes.
+
+    Файл читается построчно. Каждая пачка рецептов сохраняется в своей
+    транзакции тремя ``bulk_create``: рецепты, строки тегов и строки
+    ингредиентов. Авторы, теги и ингредиенты ищутся по заранее загруженным
+    словарям имя → id. Рецепт с тем же автором, названием и датой
+    публикации, что уже есть в БД, пропускается, поэтому повторная
+    загрузка того же файла ничего не дублирует. Для записи без даты
+    достаточно совпадения автора и названия.
+    """
+
+    help = 'Загрузка рецептов с ингредиентами и тегами из NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--input', default='-',
+            help='Файл для чтения; по умолчанию stdin.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Сколько рецептов сохранять в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        self.authors = dict(MyProfile.objects.values_list('username', 'id'))
+        self.tags = dict(Tags.objects.values_list('slug', 'id'))
+        self.ingredients = {
+            (name, measurement_unit): pk
+            for pk, name, measurement_unit in Ingredients.objects.values_list(
+                'id', 'name', 'measurement_unit'
+            )
+        }
+        self.skipped = 0
+        self.existed = 0
+        source = (
+            sys.stdin if options['input'] == '-'
+            else open(options['input'], 'r', encoding='utf-8')
+        )
+        imported = 0
+        try:
+            lines = (line for line in source if line.strip())
+            for batch in batched(lines, options['batch_size']):
+                imported += self.import_batch(batch)
+                self.stdout.write(f'Загружено рецептов: {imported}')
+        except json.JSONDecodeError as error:
+            raise CommandError(f'Некорректная строка NDJSON: {error}')
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+        rebuild_counters()
+        if self.skipped:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'Пропущено рецептов с неизвестными ссылками: '
+                    f'{self.skipped}.'
+                )
+            )
+        if self.existed:
+            self.stdout.write(
+                f'Пропущено рецептов, уже загруженных ранее: {self.existed}.'
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Загружено рецептов: {imported}. Для уменьшенных копий '
+                'картинок запустите build_image_renditions.'
+            )
+        )
+
+    def resolve(self, record):
+        """Проверяет ссылки записи и возвращает id тегов и ингредиентов.
+
+        Повторы тегов отбрасываются, количества повторённого ингредиента
+        складываются.
+        """
+        author_id = self.authors.get(record['author'])
+        tag_ids = list(dict.fromkeys(
+            self.tags.get(slug) for slug in record['tags']
+        ))
+        ingredients = {}
+        for item in record['ingredients']:
+            pk = self.ingredients.get(
+                (item['name'], item['measurement_unit'])
+            )
+            ingredients[pk] = ingredients.get(pk, 0) + item['amount']
+        if author_id is None or None in tag_ids or None in ingredients:
+            return None
+        return author_id, tag_ids, list(ingredients.items())
+
+    @staticmethod
+    def existing_keys(records):
+        """Ключи (автор, название, дата) рецептов пачки, уже лежащих в БД.
+
+        Для каждого рецепта добавляется и ключ без даты.
+        """
+        keys = set()
+        for author_id, name, created_at in Recipes.objects.filter(
+            author_id__in={key[0] for key, _, _ in records},
+            name__in={key[1] for key, _, _ in records},
+        ).values_list('author_id', 'name', 'created_at'):
+            keys.add((author_id, name, created_at))
+            keys.add((author_id, name, None))
+        return keys
+
+    def import_batch(self, lines):
+        records = []
+        for line in lines:
+            record = json.loads(line)
+            resolved = self.resolve(record)
+            if resolved is None:
+                self.skipped += 1
+                continue
+            created_at = (
+                parse_datetime(record['created_at'])
+                if record.get('created_at') else None
+            )
+            records.append(
+                ((resolved[0], record['name'], created_at), record, resolved)
+            )
+
+        existing = self.existing_keys(records)
+        recipes, relations = [], []
+        for key, record, resolved in records:
+            if key in existing:
+                self.existed += 1
+                continue
+            existing.add(key)
+            existing.add((*key[:2], None))
+            author_id, tag_ids, ingredients = resolved
+            recipes.append(Recipes(
+                author_id=author_id,
+                name=record['name'],
+                text=record['text'],
+                cooking_time=record['cooking_time'],
+                image=self.load_image(record.get('image')),
+                created_at=key[2] or timezone.now(),
+            ))
+            relations.append((tag_ids, ingredients))
+
+        with transaction.atomic(), explicit_created_at():
+            Recipes.objects.bulk_create(recipes)
+            Recipes.tags.through.objects.bulk_create([
+                Recipes.tags.through(recipes_id=recipe.id, tags_id=tag_id)
+                for recipe, (tag_ids, _) in zip(recipes, relations)
+                for tag_id in tag_ids
+            ])
+            RecipeIngredients.objects.bulk_create([
+                RecipeIngredients(
+                    recipe_id=recipe.id, ingredient_id=pk, amount=amount
+                )
+                for recipe, (_, ingredients) in zip(recipes, relations)
+                for pk, amount in ingredients
+            ])
+        return len(recipes)
+
+    @staticmethod
+    def load_image(image):
+        """Сохраняет встроенную картинку в media или возвращает путь."""
+        if not image or not image.startswith('data:image'):
+            return image or ''
+        header, encoded = image.split(';base64,')
+        extension = header.split('/')[-1]
+        try:
+            content = base64.b64decode(encoded)
+        except binascii.Error as error:
+            raise CommandError(f'Некорректная картинка: {error}')
+        return default_storage.save(
+            f'{IMAGE_UPLOAD_TO}{uuid.uuid4().hex}.{extension}',
+            ContentFile(content)
+        )
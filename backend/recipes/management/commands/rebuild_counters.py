@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    """Команда для пересчёта денормализованных счётчиков."""
+
+    help = (
+        'Пересчитывает счётчики избранного, рецептов и подписчиков '
+        'по данным связанных таблиц'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_counters()
+        self.stdout.write(self.style.SUCCESS('Счётчики пересчитаны.'))
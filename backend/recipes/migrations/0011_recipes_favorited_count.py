@@ -0,0 +1,51 @@
+# Generated by Django 4.2.19 on 2026-10-18 01:36
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(queryset, field):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0
+    )
+
+
+def fill_counters(apps, schema_editor):
+    Recipes = apps.get_model('recipes', 'Recipes')
+    MyProfile = apps.get_model('myprofile', 'MyProfile')
+    Subscription = apps.get_model('myprofile', 'Subscription')
+    favorites = MyProfile.favorite_recipes.through.objects.all()
+    Recipes.objects.update(
+        favorited_count=count_subquery(favorites, 'recipes')
+    )
+    MyProfile.objects.update(
+        recipes_count=count_subquery(Recipes.objects.all(), 'author'),
+        subscriptions_count=count_subquery(
+            Subscription.objects.all(), 'subscribe_to'
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_recipes_search_vector'),
+        ('myprofile', '0008_myprofile_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipes',
+            name='favorited_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество добавлений в избранное'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+CREATE_INDEX_SQL = '''
+CREATE INDEX IF NOT EXISTS recipes_recipes_tags_tag_recipe_idx
+    ON recipes_recipes_tags (tags_id, recipes_id);
+'''
+
+DROP_INDEX_SQL = '''
+DROP INDEX IF EXISTS recipes_recipes_tags_tag_recipe_idx;
+'''
+
+
+class Migration(migrations.Migration):
+    """Индекс для EXISTS-фильтра по тегам: сначала тег, затем рецепт.
+
+    Таблица связи создаётся Django автоматически, поэтому индекс
+    добавляется через SQL, а не через Meta.indexes.
+    """
+
+    dependencies = [
+        ('recipes', '0013_recipes_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_INDEX_SQL, DROP_INDEX_SQL),
+    ]
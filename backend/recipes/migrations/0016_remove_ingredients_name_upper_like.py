@@ -0,0 +1,17 @@
+# Generated by Django 4.2.19 on 2026-10-18 02:29
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0015_recipes_ingredients_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='ingredients',
+            name='ingredients_name_upper_like',
+        ),
+    ]
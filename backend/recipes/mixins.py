@@ -0,0 +1,25 @@
+class ProtectedFieldsMixin:
+    """Полный save() существующего объекта не трогает protected_fields.
+
+    Эти поля меняются в обход экземпляра (``F()``-обновлениями или
+    воркером), и значение, прочитанное в начале запроса, могло устареть.
+    Явно переданные ``update_fields`` сохраняются как есть.
+    """
+
+    protected_fields = ()
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if (
+            update_fields is None
+            and self.protected_fields
+            and not self._state.adding
+            and not kwargs.get('force_insert')
+        ):
+            deferred = self.get_deferred_fields()
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.protected_fields
+                and field.attname not in deferred
+            ]
+        super().save(*args, update_fields=update_fields, **kwargs)
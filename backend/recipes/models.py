@@ -1,6 +1,5 @@
-import random
-import string
-
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
@@ -17,6 +16,8 @@ from recipes.constants import (
     MIN_AMOUNT,
     MIN_COOKING_TIME,
 )
+from recipes.mixins import ProtectedFieldsMixin
+from recipes.short_links import encode_short_link
 
 
 class Tags(models.Model):
@@ -67,7 +68,7 @@ class Ingredients(models.Model):
         return f'{self.name} ({self.measurement_unit})'
 
 
-class Recipes(models.Model):
+class Recipes(ProtectedFieldsMixin, models.Model):
     """Рецепты."""
 
     author = models.ForeignKey(
@@ -81,6 +82,12 @@ class Recipes(models.Model):
     image = models.ImageField(
         upload_to='backend/image/'
     )
+    image_renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии изображения'
+    )
     text = models.TextField(verbose_name='Текст')
     tags = models.ManyToManyField(
         Tags,
@@ -103,39 +110,56 @@ class Recipes(models.Model):
         auto_now_add=True,
         verbose_name='Дата публикации'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
     short_link = models.CharField(
         max_length=MAX_LENGTH_SHORT_LINK,
         unique=True,
         blank=True,
         null=True
     )
+    favorited_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество добавлений в избранное'
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name='Поисковый вектор'
+    )
+
+    protected_fields = ('favorited_count', 'image_renditions')
 
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
         ordering = ('-created_at',)
+        indexes = [
+            GinIndex(
+                fields=('search_vector',),
+                name='recipes_search_vector_gin'
+            ),
+            models.Index(
+                fields=('-created_at', '-id'),
+                name='recipes_created_idx'
+            ),
+            models.Index(
+                fields=('author', '-created_at', '-id'),
+                name='recipes_author_created_idx'
+            ),
+        ]
 
-    def generate_short_link(self):
-        """Генерация уникальной короткой ссылки."""
-        while True:
-            recipe_hash = ''.join(
-                random.choices(string.ascii_letters + string.digits, k=6)
-            )
-            if not Recipes.objects.filter(short_link=recipe_hash).exists():
-                return recipe_hash
-
-    def save(self, *args, **kwargs):
-        if not self.short_link:
-            self.short_link = self.generate_short_link()
-        super().save(*args, **kwargs)
+    @property
+    def short_code(self):
+        """Код короткой ссылки: старый сохранённый или вычисляемый из id."""
+        return self.short_link or encode_short_link(self.pk)
 
     def __str__(self):
         return self.name
 
-    @property
-    def favorited_count(self):
-        return self.favorited_by.count()
-
 
 class RecipeIngredients(models.Model):
     recipe = models.ForeignKey(
@@ -0,0 +1,71 @@
+import hashlib
+import string
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from recipes.constants import (
+    SHORT_LINK_BITS,
+    SHORT_LINK_ID_BITS,
+    SHORT_LINK_LENGTH,
+)
+
+ALPHABET = string.digits + string.ascii_letters
+BASE = len(ALPHABET)
+SPACE = 2 ** SHORT_LINK_BITS
+MASK = SPACE - 1
+SHIFT = SHORT_LINK_BITS // 2
+
+
+@lru_cache(maxsize=None)
+def _keys():
+    if not settings.SHORT_LINK_SECRET:
+        raise ImproperlyConfigured('Не задан SHORT_LINK_SECRET.')
+    digest = hashlib.sha256(settings.SHORT_LINK_SECRET.encode()).digest()
+    multiplier = int.from_bytes(digest[:8], 'big') & MASK | 1
+    offset = int.from_bytes(digest[8:16], 'big') & MASK
+    return multiplier, pow(multiplier, -1, SPACE), offset
+
+
+def encode_short_link(recipe_id):
+    """Кодирует id рецепта в короткую ссылку фиксированной длины.
+
+    Ключевая перестановка 40-битного пространства делает коды
+    непоследовательными и не даёт им совпадать: разные id всегда дают
+    разные коды, поэтому проверять уникальность в БД не нужно. id
+    занимают только младшие SHORT_LINK_ID_BITS бит, старшие нулевые биты
+    служат контрольными: случайный код почти никогда их не проходит.
+    """
+    if not 0 <= recipe_id < 2 ** SHORT_LINK_ID_BITS:
+        raise ValueError(f'id {recipe_id} не помещается в короткую ссылку.')
+    multiplier, _, offset = _keys()
+    number = (recipe_id * multiplier + offset) & MASK
+    number ^= number >> SHIFT
+    number = number * multiplier & MASK
+    code = []
+    for _ in range(SHORT_LINK_LENGTH):
+        number, digit = divmod(number, BASE)
+        code.append(ALPHABET[digit])
+    return ''.join(reversed(code))
+
+
+def decode_short_link(code):
+    """Возвращает id рецепта или None, если код не выдавался этой схемой."""
+    if len(code) != SHORT_LINK_LENGTH:
+        return None
+    number = 0
+    for char in code:
+        digit = ALPHABET.find(char)
+        if digit < 0:
+            return None
+        number = number * BASE + digit
+    if number >= SPACE:
+        return None
+    _, inverse, offset = _keys()
+    number = number * inverse & MASK
+    number ^= number >> SHIFT
+    recipe_id = (number - offset) * inverse & MASK
+    if recipe_id >> SHORT_LINK_ID_BITS:
+        return None
+    return recipe_id
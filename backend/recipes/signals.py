@@ -0,0 +1,155 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from jobs.queue import enqueue
+from myprofile.models import Favorite, MyProfile, ShoppingCartItem
+from recipes.counters import (
+    bump_shopping_cart_version,
+    change_counter,
+    touch_recipes,
+)
+from recipes.images import renditions_outdated
+from recipes.models import Ingredients, Recipes, Tags
+from recipes.tasks import delete_image_renditions, refresh_image_renditions
+
+AUTHOR_FIELDS = frozenset(
+    ('first_name', 'last_name', 'username', 'email', 'avatar')
+)
+
+
+@receiver(post_save, sender=Recipes)
+def increment_recipes_count(sender, instance, created, **kwargs):
+    if created:
+        change_counter(
+            MyProfile.objects.filter(pk=instance.author_id),
+            'recipes_count', 1
+        )
+
+
+@receiver(post_delete, sender=Recipes)
+def decrement_recipes_count(sender, instance, **kwargs):
+    change_counter(
+        MyProfile.objects.filter(pk=instance.author_id), 'recipes_count', -1
+    )
+
+
+@receiver(m2m_changed, sender=Favorite)
+def update_favorited_count(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    if action == 'pre_clear':
+        if reverse:
+            instance._cleared_favorites = instance.favorited_by.count()
+        else:
+            instance._cleared_favorites = list(
+                instance.favorite_recipes.values_list('pk', flat=True)
+            )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    delta = 1 if action == 'post_add' else -1
+    if reverse:
+        if action == 'post_clear':
+            amount = instance._cleared_favorites
+        else:
+            amount = len(pk_set)
+        change_counter(
+            Recipes.objects.filter(pk=instance.pk),
+            'favorited_count', delta * amount
+        )
+        return
+    if action == 'post_clear':
+        pk_set = instance._cleared_favorites
+    change_counter(
+        Recipes.objects.filter(pk__in=pk_set), 'favorited_count', delta
+    )
+
+
+@receiver(pre_delete, sender=MyProfile)
+def forget_deleted_user_favorites(sender, instance, **kwargs):
+    change_counter(
+        Recipes.objects.filter(favorites__user=instance),
+        'favorited_count', -1
+    )
+
+
+@receiver(m2m_changed, sender=ShoppingCartItem)
+def shopping_cart_changed(sender, instance, action, reverse, pk_set,
+                          **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            bump_shopping_cart_version(
+                MyProfile.objects.filter(pk=instance.pk)
+            )
+        return
+    if action in ('post_add', 'post_remove'):
+        bump_shopping_cart_version(MyProfile.objects.filter(pk__in=pk_set))
+    elif action == 'pre_clear':
+        bump_shopping_cart_version(
+            MyProfile.objects.filter(shopping_cart_items__recipe=instance)
+        )
+
+
+@receiver(post_save, sender=Recipes)
+def recipe_in_shopping_cart_changed(sender, instance, created, **kwargs):
+    if not created:
+        bump_shopping_cart_version(
+            MyProfile.objects.filter(shopping_cart_items__recipe=instance)
+        )
+
+
+@receiver(pre_delete, sender=Recipes)
+def recipe_in_shopping_cart_deleted(sender, instance, **kwargs):
+    bump_shopping_cart_version(
+        MyProfile.objects.filter(shopping_cart_items__recipe=instance)
+    )
+
+
+@receiver(post_save, sender=Recipes)
+def update_image_renditions(sender, instance, update_fields, **kwargs):
+    if update_fields is not None and 'image' not in update_fields:
+        return
+    if renditions_outdated(instance, 'image', 'image_renditions'):
+        enqueue(
+            refresh_image_renditions, unique=True,
+            model='recipes.recipes', pk=instance.pk
+        )
+
+
+@receiver(post_delete, sender=Recipes)
+def delete_image_renditions_files(sender, instance, **kwargs):
+    if instance.image_renditions:
+        enqueue(delete_image_renditions, renditions=instance.image_renditions)
+
+
+@receiver(post_save, sender=MyProfile)
+def author_changed(sender, instance, created, update_fields, **kwargs):
+    if created or (
+        update_fields is not None and not AUTHOR_FIELDS & update_fields
+    ):
+        return
+    touch_recipes(Recipes.objects.filter(author=instance))
+
+
+@receiver((post_save, pre_delete), sender=Tags)
+def tag_changed(sender, instance, **kwargs):
+    touch_recipes(Recipes.objects.filter(tags=instance))
+
+
+@receiver((post_save, pre_delete), sender=Ingredients)
+def ingredient_changed(sender, instance, **kwargs):
+    touch_recipes(
+        Recipes.objects.filter(recipe_ingredients__ingredient=instance)
+    )
+    bump_shopping_cart_version(
+        MyProfile.objects.filter(
+            shopping_cart_items__recipe__recipe_ingredients__ingredient=(
+                instance
+            )
+        )
+    )
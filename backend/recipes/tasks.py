@@ -0,0 +1,38 @@
+from django.apps import apps
+
+from jobs.queue import task
+from myprofile.constants import AVATAR_SIZES
+from recipes.constants import RECIPE_IMAGE_SIZES
+from recipes.counters import touch_recipes
+from recipes.images import delete_renditions, refresh_renditions
+
+RENDITION_TARGETS = {
+    'recipes.recipes': ('image', 'image_renditions', RECIPE_IMAGE_SIZES),
+    'myprofile.myprofile': ('avatar', 'avatar_renditions', AVATAR_SIZES),
+}
+
+
+@task
+def refresh_image_renditions(model, pk):
+    """Пересобирает уменьшенные копии картинки объекта model с этим pk.
+
+    Копии аватара выводятся в рецептах автора, поэтому у них сдвигается
+    updated_at.
+    """
+    image_field, renditions_field, sizes = RENDITION_TARGETS[model]
+    label, model = model, apps.get_model(model)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    refreshed = refresh_renditions(
+        model.objects, instance, image_field, renditions_field, sizes
+    )
+    if refreshed and label == 'myprofile.myprofile':
+        touch_recipes(apps.get_model('recipes.recipes').objects.filter(
+            author_id=pk
+        ))
+
+
+@task
+def delete_image_renditions(renditions):
+    delete_renditions(renditions)
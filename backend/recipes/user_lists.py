@@ -0,0 +1,75 @@
+from django.db import connection, transaction
+
+from myprofile.models import Favorite, MyProfile, ShoppingCartItem
+from recipes.counters import bump_shopping_cart_version, change_counter
+from recipes.models import Recipes
+
+
+def update_favorited_count(user, recipe_ids, delta):
+    change_counter(
+        Recipes.objects.filter(pk__in=recipe_ids), 'favorited_count', delta
+    )
+
+
+def update_shopping_cart_version(user, recipe_ids, delta):
+    bump_shopping_cart_version(MyProfile.objects.filter(pk=user.pk))
+
+
+# Сырые INSERT/DELETE не вызывают m2m_changed, поэтому то, что для
+# add()/remove() делают сигналы, выполняется здесь явно.
+AFTER_CHANGE = {
+    Favorite: update_favorited_count,
+    ShoppingCartItem: update_shopping_cart_version,
+}
+
+
+def list_table(model):
+    """Таблица списка и её колонки для пользователя и рецепта."""
+    return (
+        model._meta.db_table,
+        model._meta.get_field('user').column,
+        model._meta.get_field('recipe').column,
+    )
+
+
+@transaction.atomic
+def add_recipes(user, model, recipe_ids):
+    """Добавляет рецепты в список пользователя одним INSERT.
+
+    Несуществующие и уже добавленные рецепты пропускаются. Возвращает id
+    рецептов, которые действительно были добавлены.
+    """
+    table, user_column, recipe_column = list_table(model)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({user_column}, {recipe_column}, '
+            'created_at) '
+            f'SELECT %s, id, now() FROM {Recipes._meta.db_table} '
+            'WHERE id = ANY(%s) '
+            f'ON CONFLICT DO NOTHING RETURNING {recipe_column}',
+            [user.pk, list(recipe_ids)]
+        )
+        added = [row[0] for row in cursor.fetchall()]
+    if added:
+        AFTER_CHANGE[model](user, added, 1)
+    return added
+
+
+@transaction.atomic
+def remove_recipes(user, model, recipe_ids):
+    """Удаляет рецепты из списка пользователя одним DELETE.
+
+    Возвращает id рецептов, которые действительно были в списке.
+    """
+    table, user_column, recipe_column = list_table(model)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table} '
+            f'WHERE {user_column} = %s AND {recipe_column} = ANY(%s) '
+            f'RETURNING {recipe_column}',
+            [user.pk, list(recipe_ids)]
+        )
+        removed = [row[0] for row in cursor.fetchall()]
+    if removed:
+        AFTER_CHANGE[model](user, removed, -1)
+    return removed